@@ -0,0 +1,229 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from config import CONFIG
+from process_memory import process_tree_rss
+from mock_site import MockSite, DEFAULT_SETTINGS
+from test_start import NewsWebsiteTest
+
+# Modes timed from a cold interpreter, none of them needs a browser
+STARTUP_MODES = ['servers', 'http']
+# Must not be imported by test_start itself, only by the modes that use them
+HEAVY_MODULES = ['playwright', 'requests']
+
+
+class ResourceMonitor:
+    """Wall time, CPU time and peak RSS of the process tree during a block"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        while True:
+            rss = process_tree_rss(os.getpid())
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+            if self.stopped.wait(self.interval):
+                break
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        self.start_self = resource.getrusage(resource.RUSAGE_SELF)
+        self.start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.thread = threading.Thread(target=self.sample, name="benchmark-rss", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_time = time.perf_counter() - self.start_time
+        self.stopped.set()
+        self.thread.join()
+
+        # Children are accounted once they exit: the Playwright driver,
+        # and the browser processes it reaped, after the run
+        end_self = resource.getrusage(resource.RUSAGE_SELF)
+        end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.cpu_user = (end_self.ru_utime - self.start_self.ru_utime) + \
+                        (end_children.ru_utime - self.start_children.ru_utime)
+        self.cpu_system = (end_self.ru_stime - self.start_self.ru_stime) + \
+                          (end_children.ru_stime - self.start_children.ru_stime)
+        if not self.peak_rss:
+            # Linux reports ru_maxrss in kB: the largest single process only
+            self.peak_rss = max(end_self.ru_maxrss, end_children.ru_maxrss) * 1024
+
+    def result(self):
+        return {
+            'wall_time': round(self.wall_time, 3),
+            'cpu_user': round(self.cpu_user, 3),
+            'cpu_system': round(self.cpu_system, 3),
+            'cpu_total': round(self.cpu_user + self.cpu_system, 3),
+            'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1)
+        }
+
+
+def configure(site, work_dir):
+    """Point CONFIG at the mock site and keep every artifact in work_dir"""
+    CONFIG['base_url'] = site.url
+    CONFIG['servers'] = {'Mock': site.host}
+    CONFIG['port'] = site.port
+    CONFIG['pinning_settings']['enabled'] = False
+    CONFIG['telegram_settings']['enable_messages'] = False
+    CONFIG['discovery_settings']['cache_file'] = os.path.join(work_dir, 'discovery_cache.json')
+    CONFIG['history_settings']['db_file'] = os.path.join(work_dir, 'history.db')
+    CONFIG['metrics_settings']['jsonl_file'] = os.path.join(work_dir, 'metrics.jsonl')
+    CONFIG['metrics_settings']['prometheus_file'] = os.path.join(work_dir, 'oxu_monitor.prom')
+    CONFIG['screenshot_settings']['directory'] = os.path.join(work_dir, 'screenshots')
+    # GA beacons of the mock must not leave the machine: the request
+    # is still seen by the checks, the connection is refused locally
+    CONFIG['browser_settings']['args'] = ['--host-resolver-rules=MAP www.google-analytics.com 127.0.0.1']
+
+
+def run_once(cold):
+    if cold and os.path.exists(CONFIG['discovery_settings']['cache_file']):
+        os.remove(CONFIG['discovery_settings']['cache_file'])
+
+    test = NewsWebsiteTest()
+    with ResourceMonitor() as monitor:
+        test.run_tests()
+    return {
+        **monitor.result(),
+        'success_count': test.success_count,
+        'error_count': test.error_count
+    }
+
+
+def run_command(command, cwd):
+    start_time = time.perf_counter()
+    subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start_time
+
+
+def measure_startup(work_dir, repeats):
+    """
+    Median wall time of a fresh interpreter importing test_start and of
+    the CLI running each mode of STARTUP_MODES against the current CONFIG,
+    plus the heavy modules the import loads
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    config_file = os.path.join(work_dir, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(CONFIG, f)
+
+    commands = {'import': [sys.executable, '-c', 'import test_start']}
+    for mode in STARTUP_MODES:
+        commands[mode] = [
+            sys.executable, os.path.join(root, 'cli.py'), mode,
+            '--config', config_file, '--log-file', os.path.join(work_dir, 'cli.log')
+        ]
+    startup = {
+        name: round(statistics.median(run_command(command, root) for _ in range(repeats)), 3)
+        for name, command in commands.items()
+    }
+
+    probe = f"import json, sys, test_start; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, '-c', probe], cwd=root, capture_output=True, text=True).stdout
+    startup['heavy_modules'] = json.loads(output) if output.strip() else None
+    return startup
+
+
+def summarize_runs(runs):
+    summary = {}
+    for key in ['wall_time', 'cpu_total', 'peak_rss_mb']:
+        values = [run[key] for run in runs]
+        summary[key] = {
+            'min': min(values),
+            'median': round(statistics.median(values), 3),
+            'max': max(values)
+        }
+    return summary
+
+
+def format_report(runs, summary, site, startup=None):
+    lines = [f"Benchmark against {site.url}, {site.requests} requests served"]
+    for i, run in enumerate(runs, 1):
+        lines.append(
+            f"Run {i}: {run['wall_time']:.2f}s wall, {run['cpu_total']:.2f}s CPU "
+            f"({run['cpu_user']:.2f} user / {run['cpu_system']:.2f} sys), "
+            f"peak RSS {run['peak_rss_mb']:.1f} MB, "
+            f"{run['success_count']} passed / {run['error_count']} failed"
+        )
+    for key, values in summary.items():
+        lines.append(f"{key}: min {values['min']}, median {values['median']}, max {values['max']}")
+    if startup:
+        heavy_modules = startup['heavy_modules']
+        lines.append(
+            f"Start-up: import {startup['import']:.3f}s, " +
+            ", ".join(f"{mode} mode {startup[mode]:.3f}s" for mode in STARTUP_MODES) +
+            f", heavy modules on import: {', '.join(heavy_modules) if heavy_modules else 'none'}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Run the full check suite against the local mock site")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--cold', action='store_true', help="drop the discovery cache before every run")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--startup-runs', type=int, default=3, help="start-up measurements per mode, 0 - none")
+    parser.add_argument('--latency', type=float, default=DEFAULT_SETTINGS['latency'], help="ms per response")
+    parser.add_argument('--jitter', type=float, default=DEFAULT_SETTINGS['jitter'], help="extra random ms")
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_SETTINGS['error_rate'])
+    parser.add_argument('--failing-section', action='append', default=[], dest='failing_sections')
+    parser.add_argument('--empty-section', action='append', default=[], dest='empty_sections')
+    parser.add_argument('--break-at-page', type=int, default=DEFAULT_SETTINGS['break_at_page'])
+    parser.add_argument('--failing-articles', action='store_true')
+    parser.add_argument('--broken-images', action='store_true')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    site = MockSite(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        failing_sections=args.failing_sections,
+        empty_sections=args.empty_sections,
+        break_at_page=args.break_at_page,
+        failing_articles=args.failing_articles,
+        broken_images=args.broken_images
+    ).start()
+
+    runs = []
+    startup = None
+    try:
+        with tempfile.TemporaryDirectory(prefix="oxu_benchmark_") as work_dir:
+            configure(site, work_dir)
+            for _ in range(args.runs):
+                runs.append(run_once(args.cold))
+            if args.startup_runs > 0:
+                startup = measure_startup(work_dir, args.startup_runs)
+    finally:
+        site.stop()
+
+    summary = summarize_runs(runs) if runs else {}
+    if args.json:
+        print(json.dumps({
+            'runs': runs, 'summary': summary, 'startup': startup, 'requests': site.requests
+        }, indent=2))
+    else:
+        print(format_report(runs, summary, site, startup))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    main()
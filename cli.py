@@ -0,0 +1,70 @@
+import argparse
+import json
+import logging
+from config import CONFIG
+
+# Modes of a run: browser - every check, servers - origin nodes only,
+# http - HTTP tier of every section, section - browser checks of one section,
+# load - load test of the origin nodes. Playwright is imported only once a browser is needed.
+MODES = ['browser', 'servers', 'http', 'section', 'load']
+
+
+def merge_config(config, overrides):
+    """
+    Apply overrides to config: settings sections (*_settings) are updated
+    key by key, any other key, e.g. servers, is replaced
+    """
+    for key, value in overrides.items():
+        if key.endswith('_settings') and isinstance(config.get(key), dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="oxu.az monitoring")
+    parser.add_argument('mode', nargs='?', choices=MODES, default='browser',
+                        help="checks to run (default: browser, all checks)")
+    parser.add_argument('--section', help="section of the section mode: main, search, a category or a tag")
+    parser.add_argument('--daemon', action='store_true', help="keep running with a warm browser")
+    parser.add_argument('--load', action='store_true', help="same as the load mode")
+    parser.add_argument('--config', help="JSON file with settings merged over config.py")
+    parser.add_argument('--log-file', default='news_website_test.log')
+    args = parser.parse_args(args)
+
+    if args.load:
+        args.mode = 'load'
+    if args.mode == 'section' and not args.section:
+        parser.error("the section mode needs --section")
+    if args.mode == 'load' and args.daemon:
+        parser.error("the load mode cannot run as a daemon")
+    return args
+
+
+def main(args=None):
+    args = parse_args(args)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filename=args.log_file
+    )
+
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            merge_config(CONFIG, json.load(f))
+
+    # Imported after the arguments are parsed, so --help and bad arguments are instant
+    from test_start import NewsWebsiteTest
+
+    test = NewsWebsiteTest()
+    if args.mode == 'load':
+        test.run_load_test()
+    elif args.daemon:
+        test.run_daemon(args.mode, args.section)
+    else:
+        test.run_tests(args.mode, args.section)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,246 @@ CONFIG = {
         'Node2': '116.202.72.122'
     },
     'port': 80,
+    'health_settings': {
+        'paths': ['/'],
+        'node_paths': {},
+        'probes': 3,
+        'max_concurrency': 50,
+        'timeout': 10
+    },
     'scroll_settings': 
     {
         'max_pages': 3,
-        'scroll_timeout': 3000,
-        'load_timeout': 5000
+        'scroll_timeout': 15000,
+        'scroll_step': 300,
+        'scroll_interval': 100,
+        'max_idle_scrolls': 50,
+        'load_timeout': 15000,
+        'analytics_timeout': 5000
+    },
+    'load_settings': {
+        # virtual users per node, each with its own keep-alive connection
+        'users': 10,
+        # seconds
+        'duration': 30,
+        # requests per second per node, the hard limits in load_test.py cap all three
+        'max_rps': 20,
+        'timeout': 10,
+        'significant_digits': 2
+    },
+    'pinning_settings': {
+        'enabled': False,
+        'hosts': ['oxu.az', 'www.oxu.az'],
+        # node browsers running at the same time, per process
+        'max_browsers': 4
+    },
+    'browser_settings': {
+        # extra Chromium command line switches
+        'args': []
+    },
+    'execution_settings': {
+        # checks running at the same time across all browsers of a process
+        'max_concurrency': 4,
+        # worker processes with their own browser, 0 or 1 - run in this process
+        'shards': 0
+    },
+    'discovery_settings': {
+        'cache_file': 'discovery_cache.json',
+        'ttl': 6 * 60 * 60,
+        'rotation_runs': 4
+    },
+    'http_tier_settings': {
+        'enabled': True,
+        'max_workers': 16,
+        'timeout': 10,
+        'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0 Safari/537.36'
+    },
+    'blocking_settings': {
+        'enabled': False,
+        'resource_types': ['image', 'media', 'font'],
+        'blocked_domains': [
+            'doubleclick.net',
+            'googlesyndication.com',
+            'googleadservices.com',
+            'adservice.google.com',
+            'adfox.ru',
+            'an.yandex.ru',
+            'criteo.com',
+            'taboola.com'
+        ],
+        'allowed_domains': ['google-analytics.com', 'googletagmanager.com']
+    },
+    'search_settings': {
+        'terms': ['ilham əliyev', 'qarabağ', 'neft', 'futbol', 'hava'],
+        # ui - type into the search form, url - open the search results URL directly
+        'mode': 'ui',
+        'path': '/search',
+        'query_param': 'q',
+        # ms from the query to the rendered results page
+        'latency_budget': 5000,
+        # result counts below drift_ratio x the median of the history baseline window
+        # fail the check, once min_samples counts are collected
+        'drift_ratio': 0.5,
+        'min_samples': 10
+    },
+    'article_settings': {
+        'enabled': True,
+        # articles sampled from every scrolled listing
+        'per_listing': 2,
+        # articles checked at the same time across all listings
+        'max_concurrency': 4,
+        'title_selector': 'h1',
+        'body_selector': 'article',
+        # ms from the navigation start to the load event
+        'load_budget': 10000
+    },
+    'web_vitals_settings': {
+        'enabled': True,
+        # ms, cls is unitless
+        'budgets': {
+            'ttfb': 1800,
+            'fcp': 3000,
+            'lcp': 4000,
+            'cls': 0.25,
+            'long_tasks': 1000,
+            'dom_content_loaded': 5000,
+            'load': 10000
+        }
+    },
+    'memory_settings': {
+        'enabled': True,
+        # force a garbage collection before every sample, so growth is retained memory
+        'collect_garbage': True,
+        # max growth over one scrolled page
+        'growth_limits': {
+            'js_heap_mb': 20,
+            'dom_nodes': 5000,
+            'listeners': 2000
+        },
+        # MB of all renderer processes of the browser, None - record only
+        'max_renderer_rss_mb': None
+    },
+    'emulation_settings': {
+        # every check runs once per profile; metrics, history and report names
+        # of the profiles after the first one carry the profile name
+        'profiles': ['desktop'],
+        'definitions': {
+            'desktop': {
+                # Playwright device descriptor, None - plain desktop context
+                'device': None,
+                'viewport': {'width': 1920, 'height': 1080},
+                # latency in ms, download and upload in kbit/s, None - no throttling
+                'network': None,
+                # CPU slowdown factor, 1 - no throttling
+                'cpu_throttling': 1,
+                # until the profile has its own latency history, its timeouts
+                # are the configured defaults x factor
+                'timeout_factor': 1,
+                # web vitals budgets over web_vitals_settings.budgets
+                'budgets': {}
+            },
+            'desktop_cable': {
+                'device': 'Desktop Chrome',
+                'viewport': {'width': 1920, 'height': 1080},
+                'network': {'latency': 28, 'download': 5000, 'upload': 1000},
+                'cpu_throttling': 1,
+                'timeout_factor': 1.5,
+                'budgets': {}
+            },
+            'mobile_slow_4g': {
+                'device': 'Pixel 5',
+                'network': {'latency': 150, 'download': 1600, 'upload': 750},
+                'cpu_throttling': 4,
+                'timeout_factor': 3,
+                'budgets': {
+                    'ttfb': 3000,
+                    'fcp': 5000,
+                    'lcp': 8000,
+                    'long_tasks': 3000,
+                    'dom_content_loaded': 10000,
+                    'load': 20000
+                }
+            }
+        }
+    },
+    'trace_settings': {
+        'enabled': True,
+        # requests kept per page
+        'size': 200
+    },
+    'screenshot_settings': {
+        # failure screenshots and network traces
+        'directory': 'screenshots',
+        # png, jpeg or webp
+        'format': 'jpeg',
+        'quality': 70,
+        # {'x': 0, 'y': 0, 'width': 1920, 'height': 1080} or None for the viewport
+        'clip': None,
+        'max_total_mb': 200,
+        'max_age_days': 7
+    },
+    'metrics_settings': {
+        'enabled': True,
+        # None - no JSON Lines export; rotated at jsonl_max_mb, jsonl_backups kept
+        'jsonl_file': 'metrics.jsonl',
+        'jsonl_max_mb': 50,
+        'jsonl_backups': 3,
+        'prometheus_file': 'oxu_monitor.prom',
+        'prefix': 'oxu_monitor'
+    },
+    'timeout_settings': {
+        'adaptive': True,
+        # timeout = p99 of the last window seconds x factor, within limits
+        'factor': 2.0,
+        'min_samples': 20,
+        'window': 24 * 60 * 60,
+        # ms, used until min_samples are collected
+        'defaults': {
+            'click': 500,
+            'menu': 1000,
+            'render': 5000,
+            'search_results': 5000
+        },
+        'limits': {
+            'navigation': [5000, 60000],
+            'render': [1000, 15000],
+            'search_results': [1000, 15000]
+        }
+    },
+    'retry_settings': {
+        'max_attempts': 2,
+        # ms
+        'backoff': 1000
+    },
+    'history_settings': {
+        'enabled': True,
+        'db_file': 'history.db',
+        # seconds
+        'rolling_window': 24 * 60 * 60,
+        'baseline_window': 7 * 24 * 60 * 60,
+        # slowdown: median of the last recent_runs values is min_ratio times
+        # the baseline median and significant at alpha
+        'recent_runs': 10,
+        'min_baseline': 30,
+        'min_ratio': 1.2,
+        'alpha': 0.01,
+        'raw_retention_days': 7,
+        'daily_retention_days': 365
+    },
+    'daemon_settings': {
+        # seconds between run starts, plus up to jitter seconds
+        'interval': 60,
+        'jitter': 10,
+        # restart the browser after max_runs runs or when the memory of the
+        # process tree grows max_memory_growth times over the first run
+        'max_runs': 100,
+        'max_memory_growth': 2.0
     },
     'telegram_settings': {
         'enable_messages': True,
+        'digest_interval': 10,
+        'timeout': 10,
+        'max_retries': 3,
         'dev_mode': False
     }
 }
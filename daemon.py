@@ -0,0 +1,61 @@
+import logging
+import os
+from process_memory import process_tree_rss
+
+
+class WarmBrowser:
+    """
+    Chromium kept running between daemon runs, relaunched after max_runs runs,
+    when the process tree grew max_memory_growth times over its size after
+    the first run, or when the browser disconnected.
+    get_playwright() returns the started Playwright, it is started on first launch.
+    """
+
+    def __init__(self, get_playwright, launch_options, settings):
+        self.get_playwright = get_playwright
+        self.launch_options = launch_options
+        self.max_runs = settings['max_runs']
+        self.max_memory_growth = settings['max_memory_growth']
+        self.browser = None
+        self.runs = 0
+        self.baseline_rss = None
+
+    async def get(self):
+        if self.browser is None or not self.browser.is_connected():
+            playwright = await self.get_playwright()
+            self.browser = await playwright.chromium.launch(**self.launch_options)
+            self.runs = 0
+            self.baseline_rss = None
+            logging.info("Daemon: browser launched")
+        return self.browser
+
+    def restart_reason(self):
+        if self.max_runs and self.runs >= self.max_runs:
+            return f"{self.runs} runs"
+
+        rss = process_tree_rss(os.getpid())
+        if rss is None:
+            return None
+        if self.baseline_rss is None:
+            self.baseline_rss = rss
+        elif self.max_memory_growth and rss > self.baseline_rss * self.max_memory_growth:
+            return f"memory grew from {self.baseline_rss / 2 ** 20:.0f} to {rss / 2 ** 20:.0f} MB"
+        return None
+
+    async def finish_run(self):
+        """Count the run and relaunch the browser on the next get() if it is due"""
+        if self.browser is None:
+            return
+        self.runs += 1
+        reason = self.restart_reason()
+        if reason:
+            logging.info(f"Daemon: restarting the browser after {reason}")
+            await self.close()
+
+    async def close(self):
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception as e:
+                logging.error(f"Error closing the browser: {str(e)}")
+            self.browser = None
@@ -0,0 +1,63 @@
+import json
+import logging
+import os
+import time
+
+
+class SectionDiscovery:
+    """
+    Disk cache of the discovered categories and tags with a TTL, plus a
+    deterministic rotation that checks every section within rotation_runs runs
+    """
+
+    def __init__(self, settings):
+        self.cache_file = settings['cache_file']
+        self.ttl = settings['ttl']
+        self.rotation_runs = max(1, settings['rotation_runs'])
+        self.state = self.read_state()
+
+    def read_state(self):
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.error(f"Error reading discovery cache: {str(e)}")
+            return {}
+
+    def write_state(self):
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logging.error(f"Error writing discovery cache: {str(e)}")
+
+    def get_cached(self):
+        """
+        Returns: (categories, tags) if the cache is younger than ttl, otherwise None
+        """
+        if time.time() - self.state.get('discovered_at', 0) > self.ttl:
+            return None
+        return self.state['categories'], self.state['tags']
+
+    def save(self, categories, tags):
+        self.state.update({
+            'discovered_at': time.time(),
+            'categories': categories,
+            'tags': tags
+        })
+        self.write_state()
+
+    def next_slot(self):
+        """Advance the persisted run counter, returns the rotation slot of this run"""
+        run = self.state.get('run', 0)
+        self.state['run'] = run + 1
+        self.write_state()
+        return run % self.rotation_runs
+
+    def select(self, sections, slot):
+        """Every rotation_runs-th section of the sorted list, starting at slot"""
+        return sorted(sections)[slot::self.rotation_runs]
@@ -0,0 +1,270 @@
+import logging
+import sqlite3
+import statistics
+import time
+from stats import mann_whitney_p, percentile
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    success_count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'browser'
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL,
+    time REAL NOT NULL,
+    check_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_check_time ON samples (check_name, metric, time);
+CREATE INDEX IF NOT EXISTS samples_time ON samples (time);
+CREATE INDEX IF NOT EXISTS samples_metric_time ON samples (metric, time);
+CREATE INDEX IF NOT EXISTS samples_run ON samples (run_id);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    check_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    avg REAL NOT NULL,
+    p50 REAL NOT NULL,
+    p95 REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (day, check_name, metric)
+);
+"""
+
+# Values kept in the history besides the phase timings, not checked for slowdowns:
+# counts, and the outcome of every check (1 passed, 0 failed)
+COUNT_METRICS = {'search_results_count'}
+OUTCOME_METRICS = {'check_passed'}
+# Front-end timings kept in the history, web_vitals_* are kept as well
+VALUE_METRICS = {'analytics_latency_seconds'}
+
+
+def metric_unit(metric):
+    """Unit of the values of a history metric"""
+    if metric == 'web_vitals_cls':
+        return ''
+    if metric.startswith('web_vitals_'):
+        return ' ms'
+    return ' sec'
+
+
+def series_name(check_name, labels):
+    """History name of a check under the node and emulation profile labels of its samples"""
+    if 'node' in labels:
+        check_name = f"{labels['node']} {check_name}"
+    if 'profile' in labels:
+        check_name = f"{check_name} [{labels['profile']}]"
+    return check_name
+
+
+def series_profile(check_name):
+    """Emulation profile of a series named by series_name, None for the first profile"""
+    if check_name.endswith(']') and ' [' in check_name:
+        return check_name[check_name.rindex(' [') + 2:-1]
+    return None
+
+
+def run_series(mode):
+    """History name of the run-level samples of a CLI mode, browser runs keep "run" """
+    return 'run' if mode == 'browser' else f"run {mode}"
+
+
+class HistoryStore:
+    """
+    SQLite store of every run and its phase timings, with rolling percentiles,
+    slowdown detection and daily downsampling of old samples
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.db = sqlite3.connect(settings['db_file'])
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        # Stores created before the CLI modes have no mode column
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(runs)")]
+        if 'mode' not in columns:
+            self.db.execute("ALTER TABLE runs ADD COLUMN mode TEXT NOT NULL DEFAULT 'browser'")
+
+    def sample_key(self, sample):
+        """
+        (check_name, metric) of a metrics sample, e.g. ("Category siyasat", "scroll page 2")
+        Returns: None for samples that are neither successful phase timings
+        nor history metrics
+        """
+        labels = sample['labels']
+        metric = sample['metric']
+        kept = metric in COUNT_METRICS | OUTCOME_METRICS | VALUE_METRICS or metric.startswith('web_vitals_')
+        if not kept:
+            if 'phase' not in labels or labels.get('status') != 'ok':
+                return None
+            metric = labels['phase']
+
+        check_name = series_name(labels.get('check', 'run'), labels)
+        if 'page' in labels:
+            metric += f" page {labels['page']}"
+        return check_name, metric
+
+    def save_run(self, started_at, duration, success_count, error_count, samples, mode='browser'):
+        """
+        Run-level samples are kept per mode, so short servers or http runs
+        do not skew the percentiles and slowdowns of full browser runs
+        Returns: id of the saved run
+        """
+        run_name = run_series(mode)
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started_at, duration, success_count, error_count, mode) VALUES (?, ?, ?, ?, ?)",
+                (started_at, duration, success_count, error_count, mode)
+            )
+            run_id = cursor.lastrowid
+            rows = [(run_id, started_at, run_name, 'run', duration)]
+            for sample in samples:
+                key = self.sample_key(sample)
+                if key:
+                    check_name = run_name if key[0] == 'run' else key[0]
+                    rows.append((run_id, sample['time'], check_name, key[1], sample['value']))
+            self.db.executemany(
+                "INSERT INTO samples (run_id, time, check_name, metric, value) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return run_id
+
+    def rolling_percentiles(self, check_name, metric, window=None):
+        """
+        Returns: dict with count, p50 and p95 over the last window seconds
+        """
+        since = time.time() - (window or self.settings['rolling_window'])
+        values = [row[0] for row in self.db.execute(
+            "SELECT value FROM samples WHERE check_name = ? AND metric = ? AND time >= ?",
+            (check_name, metric, since)
+        )]
+        return {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95)
+        }
+
+    def recent_values(self, metrics, window=None):
+        """
+        Returns: list of (check_name, metric, value) of the metrics over the last window seconds
+        """
+        since = time.time() - (window or self.settings['rolling_window'])
+        placeholders = ", ".join("?" for _ in metrics)
+        return self.db.execute(
+            f"SELECT check_name, metric, value FROM samples WHERE metric IN ({placeholders}) AND time >= ?",
+            (*metrics, since)
+        ).fetchall()
+
+    def baseline_medians(self, metric, window=None):
+        """
+        Returns: dict check_name -> (count, median) of the metric over the last window seconds
+        """
+        since = time.time() - (window or self.settings['baseline_window'])
+        groups = {}
+        for check_name, value in self.db.execute(
+            "SELECT check_name, value FROM samples WHERE metric = ? AND time >= ?", (metric, since)
+        ):
+            groups.setdefault(check_name, []).append(value)
+        return {check_name: (len(values), statistics.median(values)) for check_name, values in groups.items()}
+
+    def detect_slowdowns(self, run_id):
+        """
+        Compare the last recent_runs values of every series of the run with the
+        baseline window before them (one-sided Mann-Whitney U test)
+        Returns: list of slowdowns, each a dict with check, metric, medians, ratio and p
+        """
+        recent_runs = self.settings['recent_runs']
+        slowdowns = []
+        keys = self.db.execute(
+            "SELECT DISTINCT check_name, metric FROM samples WHERE run_id = ?", (run_id,)
+        ).fetchall()
+
+        for check_name, metric in keys:
+            if metric in COUNT_METRICS | OUTCOME_METRICS:
+                continue
+            recent = self.db.execute(
+                "SELECT time, value FROM samples WHERE check_name = ? AND metric = ? "
+                "ORDER BY time DESC LIMIT ?",
+                (check_name, metric, recent_runs)
+            ).fetchall()
+            if len(recent) < recent_runs:
+                continue
+
+            recent_start = recent[-1][0]
+            baseline = [row[0] for row in self.db.execute(
+                "SELECT value FROM samples WHERE check_name = ? AND metric = ? AND time < ? AND time >= ?",
+                (check_name, metric, recent_start, recent_start - self.settings['baseline_window'])
+            )]
+            if len(baseline) < self.settings['min_baseline']:
+                continue
+
+            recent_values = [row[1] for row in recent]
+            recent_median = statistics.median(recent_values)
+            baseline_median = statistics.median(baseline)
+            if baseline_median <= 0:
+                continue
+
+            ratio = recent_median / baseline_median
+            if ratio < self.settings['min_ratio']:
+                continue
+            p_value = mann_whitney_p(recent_values, baseline)
+            if p_value < self.settings['alpha']:
+                slowdowns.append({
+                    'check': check_name,
+                    'metric': metric,
+                    'recent': recent_median,
+                    'baseline': baseline_median,
+                    'ratio': ratio,
+                    'p': p_value
+                })
+
+        return slowdowns
+
+    def downsample(self):
+        """
+        Aggregate raw samples of whole days older than raw_retention_days into
+        daily rows and drop them, drop daily rows older than daily_retention_days
+        """
+        day = 24 * 60 * 60
+        raw_cutoff = (time.time() // day - self.settings['raw_retention_days']) * day
+        daily_cutoff = time.strftime(
+            '%Y-%m-%d', time.gmtime(time.time() - self.settings['daily_retention_days'] * day)
+        )
+
+        rows = self.db.execute(
+            "SELECT date(time, 'unixepoch'), check_name, metric, value FROM samples WHERE time < ? "
+            "ORDER BY 1, 2, 3",
+            (raw_cutoff,)
+        ).fetchall()
+
+        groups = {}
+        for sample_day, check_name, metric, value in rows:
+            groups.setdefault((sample_day, check_name, metric), []).append(value)
+
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO daily (day, check_name, metric, count, avg, p50, p95, max) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (*key, len(values), sum(values) / len(values),
+                     percentile(values, 50), percentile(values, 95), max(values))
+                    for key, values in groups.items()
+                ]
+            )
+            self.db.execute("DELETE FROM samples WHERE time < ?", (raw_cutoff,))
+            self.db.execute("DELETE FROM runs WHERE started_at < ?", (raw_cutoff,))
+            self.db.execute("DELETE FROM daily WHERE day < ?", (daily_cutoff,))
+
+        if groups:
+            logging.info(f"History: downsampled {len(rows)} samples into {len(groups)} daily rows")
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,127 @@
+import requests
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
+
+
+class ListingParser(HTMLParser):
+    """
+    Counts .index-post-block items of a listing page and notes its
+    .main-posts-title without building a DOM
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.posts = 0
+        self.has_title = False
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if name == 'class' and value:
+                classes = value.split()
+                if 'index-post-block' in classes:
+                    self.posts += 1
+                if 'main-posts-title' in classes:
+                    self.has_title = True
+
+
+class HttpTier:
+    """
+    Browserless pre-check: fetches every section and its /page/2..N URLs
+    over a pooled keep-alive session and counts the news on each page
+    """
+
+    def __init__(self, base_url, max_pages, settings, dev_mode=False):
+        self.base_url = base_url
+        self.max_pages = max_pages
+        self.max_workers = settings['max_workers']
+        self.timeout = settings['timeout']
+        self.dev_mode = dev_mode
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': settings['user_agent']})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def page_path(self, section, page_num):
+        if page_num == 1:
+            return section
+        return f"{section}/page/{page_num}"
+
+    def fetch(self, path):
+        url = f"{self.base_url}/{path}"
+        start_time = time.time()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            parser = ListingParser()
+            parser.feed(response.text)
+            parser.close()
+
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            elif not parser.has_title:
+                # The browser checks of categories and tags wait for the same title
+                error = "No listing title"
+            elif parser.posts == 0:
+                error = "No news found"
+            else:
+                error = None
+
+            return {
+                'path': path,
+                'status_code': response.status_code,
+                'posts': parser.posts,
+                'time': (time.time() - start_time) * 1000,
+                'is_ok': error is None,
+                'error': error
+            }
+        except Exception as e:
+            return {
+                'path': path,
+                'status_code': None,
+                'posts': 0,
+                'time': (time.time() - start_time) * 1000,
+                'is_ok': False,
+                'error': str(e)
+            }
+
+    def check_sections(self, sections):
+        """
+        Fetch pages 1..max_pages of every section concurrently
+        Returns: dict section -> {'pages': [...], 'is_ok': bool, 'error': str}
+        """
+        if self.dev_mode:
+            print(f"\nHTTP tier: checking {len(sections)} sections...")
+
+        paths = [
+            (section, self.page_path(section, page_num))
+            for section in sections
+            for page_num in range(1, self.max_pages + 1)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            page_results = list(executor.map(lambda item: self.fetch(item[1]), paths))
+
+        results = {section: {'pages': [], 'is_ok': True, 'error': None} for section in sections}
+        for (section, path), page_result in zip(paths, page_results):
+            result = results[section]
+            result['pages'].append(page_result)
+            if not page_result['is_ok'] and result['is_ok']:
+                result['is_ok'] = False
+                result['error'] = f"{path}: {page_result['error']}"
+
+        for section, result in results.items():
+            if not result['is_ok']:
+                logging.error(f"HTTP tier failure in {section}: {result['error']}")
+            if self.dev_mode:
+                status = "✅" if result['is_ok'] else f"❌ {result['error']}"
+                posts = [page['posts'] for page in result['pages']]
+                print(f"HTTP tier {section}: {status}, posts per page: {posts}")
+
+        return results
+
+    def close(self):
+        self.session.close()
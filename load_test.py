@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import math
+import random
+import time
+
+# Hard limits no configuration can exceed, so the load mode cannot turn into a DoS
+HARD_MAX_RPS = 100
+HARD_MAX_USERS = 50
+HARD_MAX_DURATION = 600
+
+
+class LatencyHistogram:
+    """
+    Latency histogram in the spirit of HdrHistogram: values in microseconds
+    are kept in buckets with a fixed number of significant digits, so memory
+    stays bounded and every percentile is exact to that relative precision
+    """
+
+    def __init__(self, significant_digits=2):
+        self.significant_digits = significant_digits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def bucket(self, value):
+        """Lowest value of the bucket of a value in microseconds"""
+        value = int(value)
+        if value < 10 ** self.significant_digits:
+            return value
+        scale = 10 ** (int(math.log10(value)) - self.significant_digits + 1)
+        return value // scale * scale
+
+    def record(self, value_ms):
+        value = value_ms * 1000
+        bucket = self.bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Percentile in ms, None for an empty histogram"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(bucket, self.max) / 1000
+        return self.max / 1000
+
+    def summary(self):
+        if not self.count:
+            return None
+        return {
+            'count': self.count,
+            'min': self.min / 1000,
+            'avg': self.total / self.count / 1000,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+            'max': self.max / 1000
+        }
+
+
+class RateLimiter:
+    """Evenly spaced request slots, no bursts above rate per second"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_time = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        slot = max(now, self.next_time)
+        self.next_time = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class StaleConnection(Exception):
+    """The server closed an idle kept-alive connection before the request"""
+
+
+class KeepAliveConnection:
+    """
+    HTTP/1.1 connection to a node reused across requests, reopened when closed.
+    A retry takes its own slot of the limiter, so it never exceeds the rate cap.
+    """
+
+    def __init__(self, server_ip, port, host, timeout, limiter):
+        self.server_ip = server_ip
+        self.port = port
+        self.host = host
+        self.timeout = timeout
+        self.limiter = limiter
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path):
+        """
+        GET over the kept-alive connection, the body is read and discarded
+        Returns: status code
+        """
+        reused = self.writer is not None and not self.writer.is_closing()
+        if not reused:
+            await self.connect()
+        try:
+            return await asyncio.wait_for(self.exchange(path), self.timeout)
+        except (StaleConnection, ConnectionResetError):
+            self.close()
+            if not reused:
+                raise
+        except BaseException:
+            self.close()
+            raise
+
+        # Retry once over a new connection, as browsers do
+        await self.limiter.acquire()
+        await self.connect()
+        try:
+            return await asyncio.wait_for(self.exchange(path), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.server_ip, self.port), self.timeout
+        )
+
+    async def exchange(self, path):
+        request = f"GET {path} HTTP/1.1\r\n" \
+                  f"Host: {self.host}\r\n" \
+                  f"User-Agent: oxu-load-test\r\n" \
+                  f"Connection: keep-alive\r\n\r\n"
+        self.writer.write(request.encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise StaleConnection("Connection closed by the server")
+        status_code = int(status_line.split(b' ', 2)[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            self.close()
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status_code
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def build_url_mix(categories, tags, max_pages):
+    """
+    Paths with weights: the main page most, then sections,
+    deeper /page/N pages less often
+    Returns: (paths, weights)
+    """
+    paths = ['/']
+    weights = [len(categories) + len(tags) or 1]
+    for page in range(2, max_pages + 1):
+        paths.append(f"/page/{page}")
+        weights.append(weights[0] / page)
+    for section in categories + tags:
+        for page in range(1, max_pages + 1):
+            paths.append(f"/{section}" if page == 1 else f"/{section}/page/{page}")
+            weights.append(1 / page)
+    return paths, weights
+
+
+class LoadTester:
+    """
+    Load mode for origin nodes: virtual users with keep-alive connections
+    request a weighted URL mix with the site Host header, every node is
+    paced below its rate cap
+    """
+
+    def __init__(self, servers, port, host, settings, dev_mode=False):
+        self.servers = servers
+        self.port = port
+        self.host = host
+        self.users = self.clamp('users', settings['users'], HARD_MAX_USERS)
+        self.duration = self.clamp('duration', settings['duration'], HARD_MAX_DURATION)
+        self.max_rps = self.clamp('max_rps', settings['max_rps'], HARD_MAX_RPS)
+        self.timeout = settings['timeout']
+        self.significant_digits = settings['significant_digits']
+        self.dev_mode = dev_mode
+
+    def clamp(self, name, value, limit):
+        if value <= 0:
+            logging.warning(f"Load test {name} {value} is not positive, using 1")
+            return 1
+        if value > limit:
+            logging.warning(f"Load test {name} {value} is above the hard limit, using {limit}")
+            return limit
+        return value
+
+    async def run_node(self, server_name, server_ip, paths, weights):
+        histogram = LatencyHistogram(self.significant_digits)
+        limiter = RateLimiter(self.max_rps)
+        result = {'requests': 0, 'errors': 0, 'statuses': {}, 'error_messages': {}}
+        deadline = time.monotonic() + self.duration
+
+        async def virtual_user():
+            connection = KeepAliveConnection(server_ip, self.port, self.host, self.timeout, limiter)
+            try:
+                while True:
+                    await limiter.acquire()
+                    if time.monotonic() >= deadline:
+                        return
+                    path = random.choices(paths, weights)[0]
+                    start = time.perf_counter()
+                    try:
+                        status_code = await connection.request(path)
+                        histogram.record((time.perf_counter() - start) * 1000)
+                        result['statuses'][status_code] = result['statuses'].get(status_code, 0) + 1
+                        request_ok = 200 <= status_code < 400
+                    except Exception as e:
+                        message = str(e) or type(e).__name__
+                        result['error_messages'][message] = result['error_messages'].get(message, 0) + 1
+                        request_ok = False
+                    result['requests'] += 1
+                    if not request_ok:
+                        result['errors'] += 1
+            finally:
+                connection.close()
+
+        if self.dev_mode:
+            print(f"Load test {server_name}: {self.users} users, {self.max_rps} rps cap, {self.duration} sec")
+        start_time = time.perf_counter()
+        await asyncio.gather(*[virtual_user() for _ in range(self.users)])
+        elapsed = time.perf_counter() - start_time
+
+        result['duration'] = elapsed
+        result['throughput'] = result['requests'] / elapsed if elapsed else 0
+        result['error_rate'] = result['errors'] / result['requests'] if result['requests'] else 0
+        result['latency'] = histogram.summary()
+        result['histogram'] = histogram
+        return result
+
+    async def run(self, paths, weights):
+        """
+        Load every node at the same time
+        Returns: dict server name -> result
+        """
+        results = await asyncio.gather(*[
+            self.run_node(name, ip, paths, weights) for name, ip in self.servers.items()
+        ])
+        return dict(zip(self.servers, results))
+
+
+def format_load_report(results):
+    report = "🏋️ Load test oxu.az\n\n"
+    for server_name, result in results.items():
+        report += f"🖥 {server_name}: {result['requests']} requests, {result['throughput']:.1f} req/s, " \
+                  f"errors {result['error_rate'] * 100:.1f}%\n"
+        latency = result['latency']
+        if latency:
+            report += f"  latency ms: p50 {latency['p50']:.1f}, p90 {latency['p90']:.1f}, " \
+                      f"p99 {latency['p99']:.1f}, p99.9 {latency['p99.9']:.1f}, max {latency['max']:.1f}\n"
+        if result['statuses']:
+            report += "  statuses: " + ", ".join(
+                f"{status} x{count}" for status, count in sorted(result['statuses'].items())
+            ) + "\n"
+        for message, count in result['error_messages'].items():
+            report += f"  {message} x{count}\n"
+    return report
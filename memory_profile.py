@@ -0,0 +1,95 @@
+import logging
+from process_memory import process_rss
+
+
+class MemoryProfiler:
+    """
+    Memory of a page sampled through CDP at each infinite scroll page boundary:
+    JS heap, DOM nodes and event listeners of the page, plus the RSS of all
+    renderer processes of the browser. Growth over a page above the limits
+    is returned as breaches.
+    """
+
+    def __init__(self, page, settings):
+        self.page = page
+        self.collect_garbage = settings['collect_garbage']
+        self.growth_limits = settings['growth_limits']
+        self.max_renderer_rss = settings['max_renderer_rss_mb']
+        self.cdp = None
+        self.previous = None
+
+    async def start(self):
+        self.cdp = await self.page.context.new_cdp_session(self.page)
+        await self.cdp.send('Performance.enable')
+
+    async def get_renderer_rss(self):
+        """RSS in bytes of the renderer processes, None if unavailable"""
+        browser = self.page.context.browser
+        if browser is None:
+            return None
+        try:
+            session = await browser.new_browser_cdp_session()
+            try:
+                info = await session.send('SystemInfo.getProcessInfo')
+            finally:
+                await session.detach()
+        except Exception as e:
+            logging.debug(f"Renderer process info unavailable: {str(e)}")
+            return None
+
+        # Renderers have no child processes: one /proc read per renderer
+        sizes = [process_rss(process['id']) for process in info['processInfo']
+                 if process['type'] == 'renderer']
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+
+    async def sample(self):
+        """
+        Returns: dict with js_heap (bytes), dom_nodes, listeners and renderer_rss (bytes)
+        """
+        if self.collect_garbage:
+            await self.cdp.send('HeapProfiler.collectGarbage')
+        result = await self.cdp.send('Performance.getMetrics')
+        metrics = {metric['name']: metric['value'] for metric in result['metrics']}
+        return {
+            'js_heap': metrics.get('JSHeapUsedSize'),
+            'dom_nodes': metrics.get('Nodes'),
+            'listeners': metrics.get('JSEventListeners'),
+            'renderer_rss': await self.get_renderer_rss()
+        }
+
+    def check(self, sample):
+        """
+        Returns: list of breaches of the sample against the previous one
+        """
+        breaches = []
+        if self.previous:
+            growth = {
+                'js_heap_mb': self.growth(sample, 'js_heap', 1024 * 1024),
+                'dom_nodes': self.growth(sample, 'dom_nodes'),
+                'listeners': self.growth(sample, 'listeners')
+            }
+            for name, value in growth.items():
+                limit = self.growth_limits.get(name)
+                if value is not None and limit is not None and value > limit:
+                    breaches.append(f"{name} +{value:.0f} > {limit}")
+
+        renderer_rss = sample['renderer_rss']
+        if self.max_renderer_rss and renderer_rss and renderer_rss > self.max_renderer_rss * 1024 * 1024:
+            breaches.append(f"renderer RSS {renderer_rss / 2 ** 20:.0f} MB > {self.max_renderer_rss} MB")
+
+        self.previous = sample
+        return breaches
+
+    def growth(self, sample, name, unit=1):
+        if sample[name] is None or self.previous[name] is None:
+            return None
+        return (sample[name] - self.previous[name]) / unit
+
+    async def close(self):
+        if self.cdp is not None:
+            try:
+                await self.cdp.detach()
+            except Exception:
+                # The page may already be closed
+                pass
@@ -0,0 +1,131 @@
+import contextvars
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """
+    Collects phase timings and values of one run and exports them
+    as JSON Lines and as a Prometheus textfile for node_exporter
+    """
+
+    def __init__(self, settings):
+        self.enabled = settings['enabled']
+        self.jsonl_file = settings['jsonl_file']
+        self.jsonl_max_bytes = settings['jsonl_max_mb'] * 1024 * 1024
+        self.jsonl_backups = settings['jsonl_backups']
+        self.prometheus_file = settings['prometheus_file']
+        self.prefix = settings['prefix']
+        self.samples = []
+        # Labels added to every sample recorded from the current task,
+        # e.g. the node of pinned checks
+        self.context_labels = contextvars.ContextVar('metric_labels', default={})
+
+    def set_labels(self, **labels):
+        self.context_labels.set({**self.context_labels.get(), **labels})
+
+    def get_labels(self):
+        """Labels set for the current task"""
+        return self.context_labels.get()
+
+    def record(self, name, value, **labels):
+        if not self.enabled or value is None:
+            return
+        self.samples.append({
+            'time': time.time(),
+            'metric': name,
+            'value': value,
+            'labels': {**self.context_labels.get(), **{key: str(val) for key, val in labels.items()}}
+        })
+
+    @contextmanager
+    def span(self, phase, **labels):
+        """Record the duration of the block as phase_duration_seconds"""
+        start_time = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.record('phase_duration_seconds', time.perf_counter() - start_time,
+                        phase=phase, status=status, **labels)
+
+    def format_labels(self, labels):
+        escaped = []
+        for key, value in sorted(labels.items()):
+            value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return "{" + ",".join(escaped) + "}" if escaped else ""
+
+    def rotate_jsonl(self):
+        """Keep at most jsonl_backups full files next to the current one"""
+        try:
+            if os.path.getsize(self.jsonl_file) < self.jsonl_max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.jsonl_backups - 1, 0, -1):
+            if os.path.exists(f"{self.jsonl_file}.{i}"):
+                os.replace(f"{self.jsonl_file}.{i}", f"{self.jsonl_file}.{i + 1}")
+        if self.jsonl_backups:
+            os.replace(self.jsonl_file, f"{self.jsonl_file}.1")
+        else:
+            os.remove(self.jsonl_file)
+
+    def export_jsonl(self):
+        if not self.jsonl_file:
+            return
+        self.rotate_jsonl()
+        with open(self.jsonl_file, 'a', encoding='utf-8') as f:
+            for sample in self.samples:
+                f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+    def prometheus_path(self, mode):
+        """
+        One textfile per CLI mode, so frequent servers runs do not replace
+        the series of browser runs; browser runs keep prometheus_file
+        """
+        if mode == 'browser':
+            return self.prometheus_file
+        root, extension = os.path.splitext(self.prometheus_file)
+        return f"{root}_{mode}{extension}"
+
+    def export_prometheus(self, path):
+        # The last sample wins for identical label sets
+        series = {}
+        for sample in self.samples:
+            name = f"{self.prefix}_{sample['metric']}"
+            series.setdefault(name, {})[self.format_labels(sample['labels'])] = sample['value']
+
+        lines = []
+        for name, values in sorted(series.items()):
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in values.items():
+                lines.append(f"{name}{labels} {value}")
+
+        # Write atomically so node_exporter never reads a partial file
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_file, path)
+
+    def export(self, mode='browser'):
+        """
+        Write the samples of the run and start a new one. Every sample is
+        labelled with the mode: the textfiles of all modes are read together.
+        """
+        if not self.enabled:
+            return
+        for sample in self.samples:
+            sample['labels'] = {**sample['labels'], 'mode': mode}
+        try:
+            self.export_jsonl()
+            self.export_prometheus(self.prometheus_path(mode))
+        except Exception as e:
+            logging.error(f"Error exporting metrics: {str(e)}")
+        self.samples = []
@@ -0,0 +1,314 @@
+import argparse
+import base64
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CATEGORIES = ['siyasat', 'iqtisadiyyat', 'dunya', 'sosial', 'idman', 'texnologiya']
+TAGS = ['tag/ilham-eliyev', 'tag/qarabag', 'tag/neft', 'tag/futbol']
+
+DEFAULT_SETTINGS = {
+    # ms added to every response, plus up to jitter ms
+    'latency': 0,
+    'jitter': 0,
+    # share of responses answered with 500
+    'error_rate': 0.0,
+    # sections answered with 500 / rendered without news
+    'failing_sections': [],
+    'empty_sections': [],
+    # infinite scroll stops loading at this page (0 - never)
+    'break_at_page': 0,
+    'max_pages': 50,
+    'posts_per_page': 12,
+    'analytics': True,
+    # article pages answered with 500 / with an image that fails to load
+    'failing_articles': False,
+    'broken_images': False
+}
+
+# 1x1 transparent PNG
+IMAGE = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title} - oxu.az mock</title>
+<style>
+body {{ font-family: sans-serif; margin: 0; }}
+.custom-navbar-menu, .custom-navbar-search-form {{ display: none; }}
+.custom-navbar-menu.open, .custom-navbar-search-form.open {{ display: block; }}
+.main-slider {{ height: 300px; background: #ddd; }}
+.index-post-block {{ height: 220px; margin: 10px; border: 1px solid #ccc; }}
+</style>
+</head>
+<body>
+<header>
+<button class="custom-navbar-toggle">Menu</button>
+<nav class="custom-navbar-menu"><ul>{menu}</ul></nav>
+<div class="custom-navbar-tags"><div class="swiper"><ul>{tags}</ul></div></div>
+<button class="custom-navbar-search-toggle">Search</button>
+<div class="custom-navbar-search-form"><form action="/search" method="get"><input name="q"></form></div>
+</header>
+{slider}
+<h1 class="main-posts-title">{title}</h1>
+<div class="posts" data-section="{section}" data-page="{page}" data-max-pages="{max_pages}"
+     data-analytics="{analytics}">{posts}</div>
+<script>{script}</script>
+</body>
+</html>
+"""
+
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title} - oxu.az mock</title>
+</head>
+<body>
+<article>
+<h1>{title}</h1>
+<img src="{image}" width="640" height="360">
+<p>Mock article text for {title}.</p>
+</article>
+</body>
+</html>
+"""
+
+# Menus, and infinite scroll that loads the next page near the bottom,
+# moves the URL to /page/N and sends a GA page_view beacon.
+PAGE_SCRIPT = """
+(() => {
+    const toggle = (button, target) => {
+        document.querySelector(button).addEventListener('click', () => {
+            document.querySelector(target).classList.toggle('open');
+        });
+    };
+    toggle('.custom-navbar-toggle', '.custom-navbar-menu');
+    toggle('.custom-navbar-search-toggle', '.custom-navbar-search-form');
+
+    const container = document.querySelector('.posts');
+    const section = container.dataset.section;
+    const maxPages = parseInt(container.dataset.maxPages, 10);
+    const analytics = container.dataset.analytics === '1';
+    const base = section ? '/' + section : '';
+    let page = parseInt(container.dataset.page, 10);
+    let loading = false;
+
+    const beacon = () => {
+        if (!analytics) {
+            return;
+        }
+        const url = 'https://www.google-analytics.com/g/collect?v=2&en=page_view&dl=' + encodeURIComponent(location.href);
+        fetch(url, {mode: 'no-cors', keepalive: true}).catch(() => {});
+    };
+    beacon();
+
+    if (section === 'search') {
+        return;
+    }
+
+    window.addEventListener('scroll', () => {
+        if (loading || page >= maxPages) {
+            return;
+        }
+        if (window.innerHeight + window.scrollY < document.body.scrollHeight - 600) {
+            return;
+        }
+        loading = true;
+        fetch('/api/posts?section=' + encodeURIComponent(section) + '&page=' + (page + 1))
+            .then(response => response.ok ? response.text() : Promise.reject(response.status))
+            .then(posts => {
+                container.insertAdjacentHTML('beforeend', posts);
+                page += 1;
+                history.pushState({}, '', base + '/page/' + page);
+                beacon();
+            })
+            .catch(() => {})
+            .finally(() => {
+                loading = false;
+            });
+    });
+})();
+"""
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def settings(self):
+        return self.server.settings
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests += 1
+        delay = self.settings['latency'] + random.uniform(0, self.settings['jitter'])
+        if delay:
+            time.sleep(delay / 1000)
+
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+
+        if self.settings['error_rate'] and random.random() < self.settings['error_rate']:
+            return self.respond(500, "Injected error")
+
+        if url.path == '/api/posts':
+            query = parse_qs(url.query)
+            section = query.get('section', [''])[0]
+            page = int(query.get('page', ['2'])[0])
+            break_at_page = self.settings['break_at_page']
+            if section in self.settings['failing_sections'] or (break_at_page and page >= break_at_page):
+                return self.respond(500, "Pagination error")
+            if page > self.settings['max_pages']:
+                return self.respond(404, "")
+            return self.respond(200, self.render_posts(section, page))
+
+        if url.path == '/static/news.png':
+            if self.settings['broken_images']:
+                return self.respond(404, "")
+            return self.respond(200, IMAGE, 'image/png')
+
+        if len(parts) == 2 and parts[0] == 'xeber':
+            if self.settings['failing_articles']:
+                return self.respond(500, "Article error")
+            return self.respond(200, ARTICLE_TEMPLATE.format(
+                title=html.escape(parts[1]), image='/static/news.png'
+            ))
+
+        if url.path == '/search':
+            query = parse_qs(url.query).get('q', [''])[0]
+            return self.respond(200, self.render_page('search', 1, f"Search: {query}"))
+
+        # /, /page/N, /<section>, /<section>/page/N
+        page = 1
+        if len(parts) >= 2 and parts[-2] == 'page' and parts[-1].isdigit():
+            page = int(parts[-1])
+            parts = parts[:-2]
+        section = '/'.join(parts)
+
+        if section and section not in CATEGORIES + TAGS:
+            return self.respond(404, "Not found")
+        if section in self.settings['failing_sections']:
+            return self.respond(500, "Section error")
+        return self.respond(200, self.render_page(section, page, section or "Son xəbərlər"))
+
+    def respond(self, status, body, content_type='text/html; charset=utf-8'):
+        data = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Server', 'oxu-mock')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def render_posts(self, section, page):
+        if section in self.settings['empty_sections']:
+            return ""
+        posts = []
+        for i in range(self.settings['posts_per_page']):
+            post_id = f"{section or 'main'}-{page}-{i}".replace('/', '-')
+            posts.append(
+                f'<div class="index-post-block"><a href="/xeber/{post_id}">'
+                f'<h3>News {html.escape(post_id)}</h3></a></div>'
+            )
+        return "".join(posts)
+
+    def render_links(self, sections):
+        links = ['<li><a href="https://oxu.az/"><span>Home</span></a></li>']
+        for section in sections:
+            links.append(f'<li><a href="https://oxu.az/{section}"><span>{section.split("/")[-1]}</span></a></li>')
+        return "".join(links)
+
+    def render_page(self, section, page, title):
+        return PAGE_TEMPLATE.format(
+            title=html.escape(title),
+            menu=self.render_links(CATEGORIES),
+            tags=self.render_links(TAGS),
+            slider='<div class="main-slider"></div>' if not section else '',
+            section=html.escape(section),
+            page=page,
+            max_pages=self.settings['max_pages'],
+            analytics='1' if self.settings['analytics'] else '0',
+            posts=self.render_posts(section, page),
+            script=PAGE_SCRIPT
+        )
+
+
+class MockSite:
+    """
+    Local stand-in for oxu.az with the markup the checks rely on,
+    configurable latency and fault injection
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, **settings):
+        self.server = ThreadingHTTPServer((host, port), MockSiteHandler)
+        self.server.daemon_threads = True
+        self.server.settings = {**DEFAULT_SETTINGS, **settings}
+        self.server.requests = 0
+        self.thread = None
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-site", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Local mock of oxu.az")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=DEFAULT_SETTINGS['latency'], help="ms per response")
+    parser.add_argument('--jitter', type=float, default=DEFAULT_SETTINGS['jitter'], help="extra random ms")
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_SETTINGS['error_rate'])
+    parser.add_argument('--failing-section', action='append', default=[], dest='failing_sections')
+    parser.add_argument('--empty-section', action='append', default=[], dest='empty_sections')
+    parser.add_argument('--break-at-page', type=int, default=DEFAULT_SETTINGS['break_at_page'])
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_SETTINGS['max_pages'])
+    parser.add_argument('--posts-per-page', type=int, default=DEFAULT_SETTINGS['posts_per_page'])
+    parser.add_argument('--no-analytics', action='store_false', dest='analytics')
+    parser.add_argument('--failing-articles', action='store_true')
+    parser.add_argument('--broken-images', action='store_true')
+    return parser.parse_args(args)
+
+
+def site_settings(args):
+    return {key: getattr(args, key) for key in DEFAULT_SETTINGS}
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    site = MockSite(args.host, args.port, **site_settings(args))
+    print(f"Mock oxu.az at {site.url}, settings: {json.dumps(site.server.settings)}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        site.stop()
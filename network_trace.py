@@ -0,0 +1,116 @@
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+
+class NetworkTrace:
+    """
+    Ring buffer of the last requests of a page, filled from passive page events
+    and exported as a HAR-like log only when a check fails
+    """
+
+    def __init__(self, page, size):
+        self.size = size
+        self.buffer = deque()
+        self.entries = {}
+
+        page.on("request", self.handle_request)
+        page.on("response", self.handle_response)
+        page.on("requestfinished", self.handle_finished)
+        page.on("requestfailed", self.handle_failed)
+
+    def handle_request(self, request):
+        if len(self.buffer) == self.size:
+            self.entries.pop(self.buffer.popleft(), None)
+
+        self.buffer.append(request)
+        self.entries[request] = {
+            'started': time.time(),
+            'method': request.method,
+            'url': request.url,
+            'resource_type': request.resource_type,
+            'initiator': self.get_initiator(request),
+            'status': None,
+            'size': None,
+            'timing': None,
+            'failure': None
+        }
+
+    def get_initiator(self, request):
+        referer = request.headers.get('referer')
+        if referer:
+            return referer
+        try:
+            return request.frame.url
+        except Exception:
+            # Service worker requests have no frame
+            return None
+
+    def handle_response(self, response):
+        entry = self.entries.get(response.request)
+        if entry:
+            entry['status'] = response.status
+            length = response.headers.get('content-length')
+            if length and length.isdigit():
+                entry['size'] = int(length)
+
+    async def handle_finished(self, request):
+        entry = self.entries.get(request)
+        if entry:
+            entry['timing'] = request.timing
+            # Bytes on the wire: also known for compressed and chunked
+            # responses, which have no Content-Length
+            try:
+                sizes = await request.sizes()
+                entry['size'] = sizes['responseBodySize']
+            except Exception:
+                # The page or its context may already be closed
+                pass
+
+    def handle_failed(self, request):
+        entry = self.entries.get(request)
+        if entry:
+            entry['timing'] = request.timing
+            entry['failure'] = request.failure
+
+    def phase(self, timing, start, end):
+        if timing[start] < 0 or timing[end] < 0:
+            return -1
+        return round(timing[end] - timing[start], 3)
+
+    def to_har_entry(self, entry):
+        har_entry = {
+            'startedDateTime': datetime.fromtimestamp(entry['started'], timezone.utc).isoformat(),
+            'time': -1,
+            'request': {'method': entry['method'], 'url': entry['url']},
+            'response': {'status': entry['status'] or 0, 'bodySize': entry['size'] if entry['size'] is not None else -1},
+            'timings': {},
+            '_resourceType': entry['resource_type'],
+            '_initiator': entry['initiator']
+        }
+        if entry['failure']:
+            har_entry['_failure'] = entry['failure']
+
+        timing = entry['timing']
+        if timing is None:
+            har_entry['_pending'] = True
+        else:
+            har_entry['time'] = round(max(timing['responseEnd'], 0), 3)
+            har_entry['timings'] = {
+                'dns': self.phase(timing, 'domainLookupStart', 'domainLookupEnd'),
+                'connect': self.phase(timing, 'connectStart', 'connectEnd'),
+                'ssl': self.phase(timing, 'secureConnectionStart', 'connectEnd'),
+                'wait': self.phase(timing, 'requestStart', 'responseStart'),
+                'receive': self.phase(timing, 'responseStart', 'responseEnd')
+            }
+        return har_entry
+
+    def to_har(self, page_url):
+        return {
+            'log': {
+                'version': '1.2',
+                'creator': {'name': 'oxu.az monitor', 'version': '1.0'},
+                'pages': [{'id': 'page_1', 'title': page_url}],
+                'entries': [self.to_har_entry(self.entries[request]) for request in self.buffer]
+            }
+        }
@@ -0,0 +1,155 @@
+import logging
+import queue
+import threading
+import time
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TelegramNotifier:
+    """
+    Background Telegram sender: messages are queued and delivered by a worker
+    thread over a pooled session, errors are coalesced into digests and
+    429 responses are retried after the retry_after given by Telegram
+    """
+
+    def __init__(self, bot_token, chat_id, settings, dev_mode=False):
+        self.url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+        self.enabled = settings['enable_messages']
+        self.digest_interval = settings['digest_interval']
+        self.timeout = settings['timeout']
+        self.max_retries = settings['max_retries']
+        self.dev_mode = dev_mode
+
+        # requests is imported with the first delivered message
+        self.session = None
+        self.queue = queue.Queue()
+        self.pending_errors = []
+        self.digest_deadline = None
+
+        self.worker = threading.Thread(target=self.run, name="telegram-notifier", daemon=True)
+        self.worker.start()
+
+    def send(self, message):
+        """Queue a message, pending errors are delivered before it"""
+        self.queue.put(('message', message))
+
+    def add_error(self, message):
+        """Queue an error, errors within digest_interval are sent as one message"""
+        self.queue.put(('error', message))
+
+    def flush(self):
+        """Block until every queued message and pending error is delivered"""
+        self.queue.put(('flush', None))
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(('stop', None))
+        self.worker.join()
+        if self.session is not None:
+            self.session.close()
+
+    def run(self):
+        while True:
+            timeout = None
+            if self.pending_errors:
+                timeout = max(0, self.digest_deadline - time.monotonic())
+
+            try:
+                kind, message = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self.deliver_digest()
+                continue
+
+            try:
+                if kind == 'error':
+                    if not self.pending_errors:
+                        self.digest_deadline = time.monotonic() + self.digest_interval
+                    self.pending_errors.append(message)
+                elif kind == 'message':
+                    self.deliver_digest()
+                    self.deliver(message)
+                else:
+                    self.deliver_digest()
+            except Exception as e:
+                logging.error(f"Error in Telegram notifier: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+            if kind == 'stop':
+                return
+
+    def deliver_digest(self):
+        if not self.pending_errors:
+            return
+
+        errors = self.pending_errors
+        self.pending_errors = []
+        if len(errors) == 1:
+            self.deliver(errors[0])
+            return
+
+        digest = f"❌ {len(errors)} errors during testing oxu.az\n"
+        for error in errors:
+            part = f"\n➖➖➖➖➖\n{error}"
+            if len(digest) + len(part) > MAX_MESSAGE_LENGTH:
+                self.deliver(digest)
+                digest = ""
+            digest += part
+        self.deliver(digest)
+
+    def deliver(self, message):
+        if not self.enabled:
+            logging.info(f"Telegram disabled, message not sent:\n{message}")
+            return False
+
+        # Sent as plain text: error texts contain raw <...> (Playwright call
+        # logs, "results N < M"), which Telegram rejects in HTML mode
+        data = {
+            "chat_id": self.chat_id,
+            "text": message[:MAX_MESSAGE_LENGTH],
+            "disable_web_page_preview": True
+        }
+
+        # Log the request data (without the token)
+        if self.dev_mode:
+            print(f"\nSending message to Telegram:")
+            print(f"Chat ID: {self.chat_id}")
+            print(f"Message: {message}")
+
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=data, timeout=self.timeout)
+            except Exception as e:
+                error_msg = f"Error sending to Telegram: {str(e)}"
+                logging.error(error_msg)
+                if self.dev_mode:
+                    print(f"❌ {error_msg}")
+                return False
+
+            if response.status_code == 200:
+                if self.dev_mode:
+                    print(f"✅ Message sent successfully")
+                return True
+
+            if response.status_code == 429 and attempt < self.max_retries:
+                try:
+                    retry_after = response.json()['parameters']['retry_after']
+                except Exception:
+                    retry_after = 1
+                logging.warning(f"Telegram rate limit, retrying in {retry_after} sec")
+                time.sleep(retry_after)
+                continue
+
+            error_msg = f"Error sending: HTTP {response.status_code}, {response.text}"
+            if self.dev_mode:
+                print(f"❌ {error_msg}")
+            logging.error(error_msg)
+            return False
@@ -0,0 +1,46 @@
+import os
+
+
+def process_rss(pid):
+    """
+    Returns: RSS in bytes of a single process, None if it is gone
+    or /proc is not available
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    # Kernel threads and zombies have no VmRSS
+    return 0
+
+
+def process_tree_rss(root_pid):
+    """
+    Returns: RSS in bytes of the process and all its descendants (browser,
+    renderers, Playwright driver), None where /proc is not available
+    """
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, fields follow the last ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        total += process_rss(pid) or 0
+    return total
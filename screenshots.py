@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import itertools
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class ScreenshotStore:
+    """
+    Failure artifacts directory: screenshots are encoded by Chromium in the
+    configured format, deduplicated by content hash and written by a
+    background thread that also applies the size and age retention
+    """
+
+    def __init__(self, settings):
+        self.directory = settings['directory']
+        self.format = settings['format']
+        self.quality = settings['quality']
+        self.clip = settings['clip']
+        self.max_total_bytes = settings['max_total_mb'] * 1024 * 1024
+        self.max_age = settings['max_age_days'] * 24 * 60 * 60
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+        self.hashes = self.read_hashes()
+        # Paths queued but not written yet
+        self.pending = set()
+        # Keeps names of artifacts made in the same millisecond apart
+        self.sequence = itertools.count(1)
+
+    def read_hashes(self):
+        """Content hash -> path of the screenshots already in the directory"""
+        hashes = {}
+        for filename in os.listdir(self.directory):
+            match = re.match(r'screenshot_.*_([0-9a-f]{12})\.\w+$', filename)
+            if match:
+                hashes[match.group(1)] = os.path.join(self.directory, filename)
+        return hashes
+
+    def make_path(self, prefix, name, extension, suffix=""):
+        """Unique path of a new artifact, even for the same name in the same second"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        safe_name = re.sub(r'[^\w-]+', '_', name).strip('_')
+        suffix = f"_{suffix}" if suffix else ""
+        return os.path.join(
+            self.directory, f"{prefix}_{safe_name}_{timestamp}_{next(self.sequence)}{suffix}.{extension}"
+        )
+
+    async def capture(self, page, name):
+        """
+        Take a screenshot of the page, the file is written in the background
+        Returns: path of the screenshot, an existing one for identical content
+        """
+        params = {'format': self.format}
+        if self.format != 'png':
+            params['quality'] = self.quality
+        if self.clip:
+            params['clip'] = {**self.clip, 'scale': 1}
+
+        cdp = await page.context.new_cdp_session(page)
+        try:
+            result = await cdp.send('Page.captureScreenshot', params)
+        finally:
+            await cdp.detach()
+
+        data = base64.b64decode(result['data'])
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        existing = self.hashes.get(digest)
+        if existing and (existing in self.pending or os.path.exists(existing)):
+            return existing
+
+        path = self.make_path("screenshot", name, self.format, digest)
+        self.hashes[digest] = path
+        self.save(path, data)
+        return path
+
+    def save(self, path, data):
+        """Write the bytes in the background thread"""
+        self.pending.add(path)
+        self.executor.submit(self.write, path, data)
+
+    def write(self, path, data):
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.apply_retention()
+        except Exception as e:
+            logging.error(f"Error writing {path}: {str(e)}")
+        finally:
+            self.pending.discard(path)
+
+    def apply_retention(self):
+        """Delete files older than max_age, then the oldest ones above max_total_bytes"""
+        files = []
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if filename.endswith('.tmp') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if now - mtime <= self.max_age and total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                logging.error(f"Error removing {path}: {str(e)}")
+
+    def flush(self):
+        """Block until every queued file is written"""
+        self.executor.submit(lambda: None).result()
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import socket
+import time
+from stats import summarize
+
+
+class ServerHealthChecker:
+    """
+    Asyncio health checker for origin nodes: repeated probes of a set of paths
+    per node with DNS/connect/TTFB/total timings, at most max_concurrency
+    nodes at a time
+    """
+
+    def __init__(self, servers, port, host, settings, dev_mode=False):
+        self.servers = servers
+        self.port = port
+        self.host = host
+        self.paths = settings['paths']
+        self.node_paths = settings['node_paths']
+        self.probes = settings['probes']
+        self.max_concurrency = settings['max_concurrency']
+        self.timeout = settings['timeout']
+        self.dev_mode = dev_mode
+
+    async def probe(self, server_ip, path):
+        """
+        Single GET over a fresh connection
+        Returns: dict with status, Server header and timings in ms
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+
+        addr_info = await loop.getaddrinfo(server_ip, self.port, type=socket.SOCK_STREAM)
+        dns_done = time.perf_counter()
+
+        address = addr_info[0][4]
+        reader, writer = await asyncio.open_connection(address[0], address[1])
+        connect_done = time.perf_counter()
+
+        try:
+            request = f"GET {path} HTTP/1.1\r\n" \
+                      f"Host: {self.host}\r\n" \
+                      f"User-Agent: oxu-health-check\r\n" \
+                      f"Connection: close\r\n\r\n"
+            writer.write(request.encode())
+            await writer.drain()
+
+            status_line = await reader.readline()
+            ttfb_done = time.perf_counter()
+            if not status_line:
+                raise Exception("Empty response")
+
+            parts = status_line.decode('latin-1').strip().split(' ', 2)
+            status_code = int(parts[1])
+            status_message = parts[2] if len(parts) > 2 else ''
+
+            server_header = 'Unknown'
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'server':
+                    server_header = value.strip()
+
+            # Ensure the response is read completely
+            await reader.read()
+            total_done = time.perf_counter()
+        finally:
+            writer.close()
+
+        return {
+            'status_code': status_code,
+            'status_message': status_message,
+            'server': server_header,
+            'timings': {
+                'dns': (dns_done - start) * 1000,
+                'connect': (connect_done - dns_done) * 1000,
+                'ttfb': (ttfb_done - connect_done) * 1000,
+                'total': (total_done - start) * 1000
+            }
+        }
+
+    async def check_server(self, server_name, server_ip):
+        if self.dev_mode:
+            print(f"\nChecking server {server_name} ({server_ip})...")
+
+        timings = {'dns': [], 'connect': [], 'ttfb': [], 'total': []}
+        result = {
+            'status_code': None,
+            'status_message': None,
+            'server': None,
+            'is_ok': True,
+            'errors': 0
+        }
+
+        for _ in range(self.probes):
+            for path in self.node_paths.get(server_name, self.paths):
+                try:
+                    probe = await asyncio.wait_for(self.probe(server_ip, path), self.timeout)
+                    probe_ok = 200 <= probe['status_code'] < 400
+                    for name, value in probe['timings'].items():
+                        timings[name].append(value)
+                    if result['is_ok']:
+                        result['status_code'] = probe['status_code']
+                        result['status_message'] = probe['status_message']
+                        result['server'] = probe['server']
+                except Exception as e:
+                    probe_ok = False
+                    probe = {
+                        'status_code': None,
+                        'status_message': str(e) or type(e).__name__,
+                        'server': None
+                    }
+
+                if not probe_ok:
+                    result['errors'] += 1
+                    if result['is_ok']:
+                        result['is_ok'] = False
+                        result['status_code'] = probe['status_code']
+                        result['status_message'] = f"{path}: {probe['status_message']}"
+                        result['server'] = probe['server']
+
+        result['timings'] = {name: summarize(values) for name, values in timings.items()}
+
+        if self.dev_mode:
+            print(f"Server {server_name}:")
+            print(f"  Status code: {result['status_code']}")
+            print(f"  Status: {result['status_message']}")
+            print(f"  Server: {result['server']}")
+            print(f"  Working: {'Yes' if result['is_ok'] else 'No'}")
+            for name, summary in result['timings'].items():
+                if summary:
+                    print(f"  {name}: p50 {summary['p50']:.1f} ms, "
+                          f"p95 {summary['p95']:.1f} ms, p99 {summary['p99']:.1f} ms")
+
+        if not result['is_ok']:
+            logging.error(f"Server {server_name} check failed: {result['status_message']}")
+
+        return result
+
+    async def check_all(self):
+        """
+        Returns: dict server name -> result
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def check_with_limit(server_name, server_ip):
+            async with semaphore:
+                return await self.check_server(server_name, server_ip)
+
+        results = await asyncio.gather(*[
+            check_with_limit(name, ip) for name, ip in self.servers.items()
+        ])
+        return dict(zip(self.servers, results))
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def plan_shards(units, shards):
+    """
+    Split the units into at most shards contiguous, equally sized parts.
+    Units are expected grouped by node, so a shard launches few browsers.
+    """
+    shards = max(1, min(shards, len(units)))
+    return [units[i * len(units) // shards:(i + 1) * len(units) // shards] for i in range(shards)]
+
+
+async def run_shards(worker, shards, config):
+    """
+    Run worker(shard_id, units, config) for every shard in its own process.
+    Processes are spawned, not forked: the parent has a running event loop
+    and background threads.
+    Returns: list of (result or exception, duration) in shard order
+    """
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context('spawn')
+
+    async def run(pool, shard_id, units):
+        start_time = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(pool, worker, shard_id, units, config)
+        except Exception as e:
+            logging.error(f"Shard {shard_id} failed: {str(e)}")
+            result = e
+        return result, time.perf_counter() - start_time
+
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        return await asyncio.gather(*[
+            run(pool, shard_id, units) for shard_id, units in enumerate(shards, 1)
+        ])
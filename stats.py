@@ -0,0 +1,61 @@
+import math
+from statistics import NormalDist
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers, None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    """
+    Returns: dict with count, min, avg, max, p50, p95 and p99 of the values,
+    None for an empty list
+    """
+    if not values:
+        return None
+    return {
+        'count': len(values),
+        'min': min(values),
+        'avg': sum(values) / len(values),
+        'max': max(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99)
+    }
+
+
+def mann_whitney_p(sample, baseline):
+    """
+    One-sided Mann-Whitney U test, normal approximation with tie correction
+    Returns: p-value for the hypothesis that sample values are larger than baseline
+    """
+    n1, n2 = len(sample), len(baseline)
+    n = n1 + n2
+    if not n1 or not n2:
+        return 1.0
+
+    combined = sorted([(value, True) for value in sample] + [(value, False) for value in baseline])
+    rank_sum = 0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1])
+        i = j + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - NormalDist().cdf(z)
@@ -1,12 +1,256 @@
-from playwright.sync_api import sync_playwright
-import requests
 import logging
-import http.client
+import asyncio
+import json
 import time
+import math
 import random
-from concurrent.futures import ThreadPoolExecutor
+import signal
+import contextvars
 from config import CONFIG
+from discovery import SectionDiscovery
+from server_health import ServerHealthChecker
+from notifier import TelegramNotifier
+from metrics import Metrics
+from history import HistoryStore, metric_unit, run_series, series_name
+from timeouts import TimeoutPolicy
+from network_trace import NetworkTrace
+from screenshots import ScreenshotStore
+from daemon import WarmBrowser
+from memory_profile import MemoryProfiler
+from load_test import LoadTester, build_url_mix, format_load_report
+from sharding import plan_shards, run_shards
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs, urlencode
+
+
+def async_playwright():
+    """Playwright is imported only by the modes that drive a browser"""
+    from playwright.async_api import async_playwright as start_playwright
+    return start_playwright()
+
+
+# Collects name (span text) and href of every link matching the selector.
+MENU_LINKS_SCRIPT = """
+(selector) => Array.from(document.querySelectorAll(selector), link => {
+    const span = link.querySelector('span');
+    return {
+        name: span ? span.textContent.trim() : '',
+        href: link.getAttribute('href')
+    };
+})
+"""
+
+# Added to every context: observes LCP, CLS (largest session window) and
+# long tasks from the start of each document.
+WEB_VITALS_INIT_SCRIPT = """
+(() => {
+    if (window.top !== window || window.__webVitals) {
+        return;
+    }
+    const vitals = window.__webVitals = {lcp: null, cls: 0, longTasks: 0};
+
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(callback))
+                .observe({type: type, buffered: true});
+        } catch (e) {
+            // Entry type not supported
+        }
+    };
+
+    observe('largest-contentful-paint', entry => {
+        vitals.lcp = entry.startTime;
+    });
+
+    let sessionValue = 0;
+    let sessionStart = 0;
+    let sessionLast = 0;
+    observe('layout-shift', entry => {
+        if (entry.hadRecentInput) {
+            return;
+        }
+        if (sessionValue && entry.startTime - sessionLast < 1000 && entry.startTime - sessionStart < 5000) {
+            sessionValue += entry.value;
+        } else {
+            sessionValue = entry.value;
+            sessionStart = entry.startTime;
+        }
+        sessionLast = entry.startTime;
+        vitals.cls = Math.max(vitals.cls, sessionValue);
+    });
+
+    observe('longtask', entry => {
+        vitals.longTasks += entry.duration;
+    });
+})();
+"""
+
+# Navigation Timing and the observed vitals of the current document, in ms
+# (cls is unitless).
+WEB_VITALS_SCRIPT = """
+() => {
+    const vitals = window.__webVitals || {lcp: null, cls: null, longTasks: null};
+    const nav = performance.getEntriesByType('navigation')[0];
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    return {
+        dns: nav ? nav.domainLookupEnd - nav.domainLookupStart : null,
+        connect: nav ? nav.connectEnd - nav.connectStart : null,
+        ttfb: nav ? nav.responseStart : null,
+        dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+        load: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+        fcp: fcp ? fcp.startTime : null,
+        lcp: vitals.lcp,
+        cls: vitals.cls,
+        long_tasks: vitals.longTasks
+    };
+}
+"""
+
+# Injected once per page: scrolls in the page until location.pathname reaches
+# /page/N (tracked through history.pushState/replaceState) and counts new
+# .index-post-block elements with a MutationObserver.
+# Evaluating it returns the current number of posts.
+SCROLL_DRIVER_SCRIPT = """
+() => {
+    if (window.__scrollDriver) {
+        return window.__scrollDriver.state.posts;
+    }
+
+    const state = {
+        posts: document.querySelectorAll('.index-post-block').length,
+        pageTimes: {},
+        listeners: []
+    };
+
+    const currentPage = () => {
+        const match = location.pathname.match(/\\/page\\/(\\d+)/);
+        return match ? parseInt(match[1], 10) : 1;
+    };
+
+    let lastPage = currentPage();
+    const notify = () => {
+        const page = currentPage();
+        if (page !== lastPage) {
+            state.pageTimes[page] = Date.now();
+            lastPage = page;
+        }
+        state.listeners.forEach(listener => listener());
+    };
+
+    for (const method of ['pushState', 'replaceState']) {
+        const original = history[method];
+        history[method] = function (...args) {
+            const result = original.apply(this, args);
+            notify();
+            return result;
+        };
+    }
+    window.addEventListener('popstate', notify);
+
+    new MutationObserver(mutations => {
+        let added = 0;
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType !== Node.ELEMENT_NODE) {
+                    continue;
+                }
+                if (node.matches('.index-post-block')) {
+                    added++;
+                }
+                added += node.querySelectorAll('.index-post-block').length;
+            }
+        }
+        if (added) {
+            state.posts += added;
+            notify();
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+
+    const scrollTo = (targetPage, options) => new Promise(resolve => {
+        const start = performance.now();
+        const startPosts = state.posts;
+        let lastPosts = state.posts;
+        let distance = 0;
+        let idleSteps = 0;
+        let done = false;
+        let timer = null;
+
+        const finish = (reached, reason) => {
+            if (done) {
+                return;
+            }
+            done = true;
+            clearInterval(timer);
+            state.listeners = state.listeners.filter(listener => listener !== check);
+            resolve({
+                page: targetPage,
+                reached: reached,
+                reason: reason,
+                time: performance.now() - start,
+                changeTime: state.pageTimes[targetPage] || Date.now(),
+                postsAdded: state.posts - startPosts,
+                totalPosts: state.posts,
+                scrollDistance: distance,
+                url: location.href
+            });
+        };
+
+        const check = () => {
+            if (currentPage() === targetPage) {
+                finish(true, 'reached');
+            }
+        };
+
+        state.listeners.push(check);
+        check();
+
+        timer = setInterval(() => {
+            if (performance.now() - start > options.timeout) {
+                return finish(false, 'Timeout');
+            }
+
+            const before = window.scrollY;
+            window.scrollBy(0, options.step);
+            const moved = Math.abs(window.scrollY - before);
+            distance += moved;
+
+            if (moved || state.posts > lastPosts) {
+                lastPosts = state.posts;
+                idleSteps = 0;
+            } else if (++idleSteps > options.maxIdleSteps) {
+                return finish(false, 'Scroll limit reached');
+            }
+            check();
+        }, options.interval);
+    });
+
+    window.__scrollDriver = {state, currentPage, scrollTo};
+    return state.posts;
+}
+"""
+
+# Absolute URLs of the news links on a listing
+ARTICLE_LINKS_SCRIPT = """
+() => [...document.querySelectorAll('.index-post-block a[href]')].map(link => link.href)
+"""
+
+# Article body, images that failed to load and navigation timings
+ARTICLE_SCRIPT = """
+(bodySelector) => {
+    const body = document.querySelector(bodySelector);
+    const images = body ? [...body.querySelectorAll('img')] : [];
+    const navigation = performance.getEntriesByType('navigation')[0];
+    return {
+        body: !!body && body.innerText.trim().length > 0,
+        images: images.length,
+        broken_images: images.filter(img => img.complete && img.naturalWidth === 0).map(img => img.currentSrc || img.src),
+        ttfb: navigation ? navigation.responseStart : null,
+        dom_content_loaded: navigation ? navigation.domContentLoadedEventEnd : null,
+        load: navigation ? navigation.loadEventEnd : null
+    };
+}
+"""
+
 
 class NewsWebsiteTest:
     def __init__(self):
@@ -17,14 +261,71 @@ class NewsWebsiteTest:
         self.port = CONFIG['port']
         self.dev_mode = False
         self.enable_telegram = CONFIG['telegram_settings']['enable_messages']
+        self.metrics = Metrics(CONFIG['metrics_settings'])
+        self.notifier = TelegramNotifier(self.bot_token, self.chat_id, CONFIG['telegram_settings'], self.dev_mode)
         self.categories = []
         self.tags = []
         self.max_pages = CONFIG['scroll_settings']['max_pages']
         self.scroll_timeout = CONFIG['scroll_settings']['scroll_timeout']
         self.load_timeout = CONFIG['scroll_settings']['load_timeout']
+        self.scroll_step = CONFIG['scroll_settings']['scroll_step']
+        self.scroll_interval = CONFIG['scroll_settings']['scroll_interval']
+        self.max_idle_scrolls = CONFIG['scroll_settings']['max_idle_scrolls']
+        self.analytics_timeout = CONFIG['scroll_settings']['analytics_timeout']
+        self.max_concurrency = CONFIG['execution_settings']['max_concurrency']
+        self.shards = CONFIG['execution_settings']['shards']
+        self.shard_results = []
+        # Errors of a shard worker are returned to the coordinator instead of sent
+        self.shard_errors = None
+        self.discovery = SectionDiscovery(CONFIG['discovery_settings'])
+        self.http_tier_enabled = CONFIG['http_tier_settings']['enabled']
+        self.http_results = {}
+        self.server_results = {}
+        self.pinning = CONFIG['pinning_settings']
+        self.web_vitals = CONFIG['web_vitals_settings']
+        self.memory_settings = CONFIG['memory_settings']
+        self.search_settings = CONFIG['search_settings']
+        self.article_settings = CONFIG['article_settings']
+        self.emulation = CONFIG['emulation_settings']
+        # Playwright device descriptors, set once Playwright is started
+        self.devices = {}
+        # Emulation profile of the checks of the current task
+        self.current_profile = contextvars.ContextVar('emulation_profile', default=None)
+        self.profile_results = {}
+        # Started on first use by start_playwright
+        self.playwright = None
+        # Check methods of the run, None - all of them
+        self.check_kinds = None
+        self.article_semaphore = None
+        # Checks and node browsers of the run, created per run in reset_run_state
+        self.check_semaphore = None
+        self.browser_semaphore = None
+        self.article_results = []
+        self.checked_articles = set()
+        # check name -> (count, median) of the search result counts in the history
+        self.search_baselines = {}
+        self.history_settings = CONFIG['history_settings']
+        # Page loads fall back to scroll_settings.load_timeout
+        timeout_settings = CONFIG['timeout_settings']
+        timeout_defaults = {'navigation': self.load_timeout, **timeout_settings['defaults']}
+        self.timeouts = TimeoutPolicy(
+            {**timeout_settings, 'defaults': timeout_defaults}, self.history_settings, self.metrics.get_labels
+        )
+        self.max_attempts = CONFIG['retry_settings']['max_attempts']
+        self.retry_backoff = CONFIG['retry_settings']['backoff']
+        self.flaky_checks = []
+        self.trace_settings = CONFIG['trace_settings']
+        self.network_traces = {}
+        self.screenshots = ScreenshotStore(CONFIG['screenshot_settings'])
+        self.node_results = {}
+        self.blocking = CONFIG['blocking_settings']
+        self.daemon_settings = CONFIG['daemon_settings']
         self.success_count = 0
         self.error_count = 0
         self.start_time = None
+        # CLI mode of the current run
+        self.mode = 'browser'
+        self.analytics_latencies = []
 
     def format_error_message(self, error, context=""):
         
@@ -41,227 +342,264 @@ class NewsWebsiteTest:
     def send_test_report(self):
         
         duration = time.time() - self.start_time
+        self.metrics.record('run_duration_seconds', duration)
+        self.metrics.record('checks', self.success_count, result="success")
+        self.metrics.record('checks', self.error_count, result="error")
         report = "📊 Test Report for oxu.az\n\n"
         report += f"✅ Successful checks: {self.success_count}\n"
         report += f"❌ Errors: {self.error_count}\n"
         report += f"⏱ Duration: {duration:.1f} sec\n"
+        if self.server_results:
+            servers_ok = sum(1 for result in self.server_results.values() if result['is_ok'])
+            report += f"🖥 Servers: {servers_ok}/{len(self.server_results)} OK\n"
+        for node, result in self.node_results.items():
+            report += f"🔗 {node}: ✅ {result['success']} ❌ {result['error']}, {result['duration']:.1f} sec\n"
+        if self.http_results:
+            http_ok = sum(1 for result in self.http_results.values() if result['is_ok'])
+            report += f"🌐 HTTP tier: {http_ok}/{len(self.http_results)} sections OK\n"
+        if len(self.profile_results) > 1:
+            for profile, result in self.profile_results.items():
+                durations = result['durations']
+                report += f"📱 {profile}: ✅ {result['success']} ❌ {result['error']}"
+                if durations:
+                    report += f", avg check {sum(durations) / len(durations):.1f} sec"
+                report += "\n"
+        for shard in self.shard_results:
+            report += f"🧩 Shard {shard['shard']}: {shard['checks']} checks, " \
+                      f"✅ {shard['success']} ❌ {shard['error']}, {shard['duration']:.1f} sec\n"
+        if self.article_results:
+            articles_ok = sum(1 for result in self.article_results if not result['error'])
+            load_times = [result['load'] for result in self.article_results if result['load'] is not None]
+            report += f"📰 Articles: {articles_ok}/{len(self.article_results)} OK"
+            if load_times:
+                report += f", load avg {sum(load_times) / len(load_times):.0f} ms, max {max(load_times):.0f} ms"
+            report += "\n"
+        if self.flaky_checks:
+            report += f"🔁 Flaky (passed on retry): {', '.join(self.flaky_checks)}\n"
+        if self.analytics_latencies:
+            latencies = [item['latency'] for item in self.analytics_latencies]
+            report += f"📈 GA latency: avg {sum(latencies) / len(latencies):.0f} ms, max {max(latencies):.0f} ms\n"
+        report += self.record_history(duration)
         
         self.send_telegram_message(report)
 
-    def send_telegram_message(self, message):
-        
-        try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            data = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": True
-            }
+    def record_history(self, duration):
+        """
+        Save the run to the history store
+        Returns: report lines with rolling run duration and detected slowdowns
+        """
+        if not self.history_settings['enabled']:
+            return ""
 
-            # Log the request data (without the token)
-            if self.dev_mode:
-                print(f"\nSending message to Telegram:")
-                print(f"Chat ID: {self.chat_id}")
-                print(f"Message: {message}")
+        try:
+            history = HistoryStore(self.history_settings)
+            try:
+                run_id = history.save_run(
+                    self.start_time, duration, self.success_count, self.error_count,
+                    self.metrics.samples, self.mode
+                )
+                rolling = history.rolling_percentiles(run_series(self.mode), 'run')
+                slowdowns = history.detect_slowdowns(run_id)
+                history.downsample()
+            finally:
+                history.close()
+        except Exception as e:
+            logging.error(f"Error saving run history: {str(e)}")
+            return ""
+
+        lines = ""
+        if rolling['count'] > 1:
+            lines += f"📉 Duration p50/p95: {rolling['p50']:.1f}/{rolling['p95']:.1f} sec\n"
+        if slowdowns:
+            lines += "🐢 Slowdowns:\n"
+            for slowdown in slowdowns:
+                unit = metric_unit(slowdown['metric'])
+                lines += f"  {slowdown['check']} {slowdown['metric']}: {slowdown['recent']:.2f}{unit} " \
+                         f"vs {slowdown['baseline']:.2f}{unit} (x{slowdown['ratio']:.1f}, p={slowdown['p']:.4f})\n"
+        return lines
 
-            # Send the request
-            response = requests.post(url, data=data, timeout=10)
-            
-            # Check the response
-            if response.status_code == 200:
-                if self.dev_mode:
-                    print(f"✅ Message sent successfully")
-                return True
-            else:
-                error_msg = f"Error sending: HTTP {response.status_code}, {response.text}"
-                if self.dev_mode:
-                    print(f"❌ {error_msg}")
-                logging.error(error_msg)
-                return False
+    def send_telegram_message(self, message):
+        """Queue a message for the background notifier, never blocks the checks"""
+        self.notifier.send(message)
 
-        except Exception as e:
-            error_msg = f"Error sending to Telegram: {str(e)}"
-            logging.error(error_msg)
-            if self.dev_mode:
-                print(f"❌ {error_msg}")
-            return False
+    def send_error_message(self, message):
+        """Queue an error, errors close in time are delivered as one digest"""
+        if self.shard_errors is not None:
+            self.shard_errors.append(message)
+            return
+        self.notifier.add_error(message)
 
-    def safe_click(self, page, selector):
+    async def safe_click(self, page, selector):
         try:
-            element = page.wait_for_selector(selector, timeout=500)
+            element = await page.wait_for_selector(selector, timeout=self.timeouts.get('click'))
             if element:
-                element.click()
+                await element.click()
                 return True
             return False
         except Exception:
             return False
 
-    def make_screenshot(self, page, name):
+    def artifact_name(self, name):
+        """Name of a failure artifact with the node and profile of the current task"""
+        return series_name(name, self.metrics.get_labels())
+
+    async def make_screenshot(self, page, name):
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"screenshot_{name}_{timestamp}.png"
-            page.screenshot(path=filename)
-            return filename
+            return await self.screenshots.capture(page, self.artifact_name(name))
         except Exception as e:
             logging.error(f"Error taking screenshot: {str(e)}")
             return None
 
-    def get_categories(self, page):
+    async def new_page(self, context):
+        """New page with a network trace ring buffer when tracing is enabled"""
+        page = await context.new_page()
+        profile = self.get_profile()
+        if profile and (profile['network'] or profile['cpu_throttling'] > 1):
+            await self.throttle(page, profile)
+        if self.trace_settings['enabled']:
+            self.network_traces[page] = NetworkTrace(page, self.trace_settings['size'])
+            page.on("close", lambda closed_page: self.network_traces.pop(closed_page, None))
+        return page
+
+    async def throttle(self, page, profile):
+        """Network and CPU throttling of the page over CDP, kept for the life of the page"""
+        cdp = await page.context.new_cdp_session(page)
+        network = profile['network']
+        if network:
+            await cdp.send('Network.enable')
+            await cdp.send('Network.emulateNetworkConditions', {
+                'offline': False,
+                'latency': network['latency'],
+                # kbit/s to bytes/s
+                'downloadThroughput': network['download'] * 1000 / 8,
+                'uploadThroughput': network['upload'] * 1000 / 8
+            })
+        if profile['cpu_throttling'] > 1:
+            await cdp.send('Emulation.setCPUThrottlingRate', {'rate': profile['cpu_throttling']})
+
+    async def dump_network_trace(self, page, name):
+        trace = self.network_traces.get(page)
+        if not trace:
+            return None
+        try:
+            path = self.screenshots.make_path("network", self.artifact_name(name), "har")
+            har = json.dumps(trace.to_har(page.url), ensure_ascii=False, indent=1)
+            self.screenshots.save(path, har.encode('utf-8'))
+            return path
+        except Exception as e:
+            logging.error(f"Error writing network trace: {str(e)}")
+            return None
+
+    def extract_sections(self, links, excluded):
+        sections = []
+        for link in links:
+            name = link['name']
+            href = link['href']
+            if name and name not in excluded and href and 'oxu.az' in href:
+                sections.append(href.split('oxu.az/')[1])
+        return sections
+
+    async def get_categories(self, page):
         try:
             if self.dev_mode:
                 print("Getting the list of categories...")
             
-            # Click the menu button
-            self.safe_click(page, '.custom-navbar-toggle')
-            page.wait_for_timeout(500)
-
-            # Wait for the menu to appear
-            page.wait_for_selector('.custom-navbar-menu', timeout=1000)
+            # Get all the links from the menu in a single call
+            menu_links = await page.evaluate(MENU_LINKS_SCRIPT, '.custom-navbar-menu ul li a')
+
+            if not menu_links:
+                # The menu is not rendered yet, open it
+                await self.safe_click(page, '.custom-navbar-toggle')
+                await page.wait_for_selector('.custom-navbar-menu', timeout=self.timeouts.get('menu'))
+                menu_links = await page.evaluate(MENU_LINKS_SCRIPT, '.custom-navbar-menu ul li a')
+                await self.safe_click(page, '.custom-navbar-toggle')
             
-            # Get all the links from the menu
-            menu_links = page.query_selector_all('.custom-navbar-menu ul li a')
-            
-            categories = []
-            excluded_categories = ['Home']
-            
-            for link in menu_links:
-                category_span = link.query_selector('span')
-                if category_span:
-                    category_name = category_span.inner_text().strip()
-                    if category_name and category_name not in excluded_categories:
-                        href = link.get_attribute('href')
-                        if href and 'oxu.az' in href:
-                            category_path = href.split('oxu.az/')[1]
-                            categories.append(category_path)
-
-            # Close the menu
-            self.safe_click(page, '.custom-navbar-toggle')
-            page.wait_for_timeout(300)
-
-            # Select random 3 categories
-            random_categories = random.sample(categories, min(3, len(categories)))
+            categories = self.extract_sections(menu_links, ['Home'])
 
             if self.dev_mode:
-                print(f"Found categories: {random_categories}")
+                print(f"Found categories: {categories}")
                 
-            return random_categories
+            return categories
                 
         except Exception as e:
-            screenshot = self.make_screenshot(page, "categories_error")
+            screenshot = await self.make_screenshot(page, "categories_error")
             error_msg = f"Error getting categories: {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, "categories_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
         
 
-    def get_tags(self, page):
+    async def get_tags(self, page):
         try:
             if self.dev_mode:
                 print("Getting the list of tags...")
         
             # Wait for the menu to appear
-            page.wait_for_selector('.custom-navbar-tags', timeout=1000)
-            
-            # Get all the links from the menu
-            menu_links = page.query_selector_all('.swiper ul li a')
+            await page.wait_for_selector('.custom-navbar-tags', timeout=self.timeouts.get('menu'))
             
-            tags = []
-            excluded_tags = ['Home']
-            
-            for link in menu_links:
-                tag_span = link.query_selector('span')
-                if tag_span:
-                    tag_name = tag_span.inner_text().strip()
-                    if tag_name and tag_name not in excluded_tags:
-                        href = link.get_attribute('href')
-                        if href and 'oxu.az' in href:
-                            tag_path = href.split('oxu.az/')[1]
-                            tags.append(tag_path)
-
+            # Get all the links from the menu in a single call
+            menu_links = await page.evaluate(MENU_LINKS_SCRIPT, '.swiper ul li a')
             
-            # Select random 3 tags
-            random_tags = random.sample(tags, min(3, len(tags)))
+            tags = self.extract_sections(menu_links, ['Home'])
 
             if self.dev_mode:
-                print(f"Found tags: {random_tags}")
+                print(f"Found tags: {tags}")
                 
-            return random_tags
+            return tags
                 
         except Exception as e:
-            screenshot = self.make_screenshot(page, "tags_error")
+            screenshot = await self.make_screenshot(page, "tags_error")
             error_msg = f"Error getting tags: {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, "tags_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
 
-    def check_server(self, server_name, server_ip):
-            try:
-                if self.dev_mode:
-                    print(f"\nChecking server {server_name} ({server_ip})...")
-
-                conn = http.client.HTTPConnection(server_ip, self.port, timeout=10)
-                conn.request("GET", "/", headers={"Host": "oxu.az"})
-                response = conn.getresponse()
-
-                status_code = response.status
-                status_message = response.reason
-                server_header = response.getheader('Server', 'Unknown')
-
-                response.read()  # Ensure the response is read completely
-                conn.close()
-
-                result = {
-                    'status_code': status_code,
-                    'status_message': status_message,
-                    'server': server_header,
-                    'is_ok': 200 <= status_code < 400
-                }
-
-                if self.dev_mode:
-                    print(f"Server {server_name}:")
-                    print(f"  Status code: {status_code}")
-                    print(f"  Status: {status_message}")
-                    print(f"  Server: {server_header}")
-                    print(f"  Working: {'Yes' if result['is_ok'] else 'No'}")
+    async def discover_sections(self, get_browser):
+        """
+        Categories and tags from the discovery cache,
+        the menus are scraped only when the cache has expired
+        """
+        cached = self.discovery.get_cached()
+        if cached:
+            if self.dev_mode:
+                print("Using cached categories and tags")
+            return cached
 
-                return result
-            except Exception as e:
-                error_msg = f"Error checking server {server_name}: {str(e)}"
-                if self.dev_mode:
-                    print(error_msg)
-                return {
-                    'status_code': None,
-                    'status_message': str(e),
-                    'server': None,
-                    'is_ok': False
-                }
+        context = await self.new_context(await get_browser())
+        try:
+            page = await self.new_page(context)
+            await page.goto(self.base_url, timeout=self.timeouts.get('navigation'))
+            categories = await self.get_categories(page)
+            tags = await self.get_tags(page)
+        finally:
+            await context.close()
 
+        self.discovery.save(categories, tags)
+        return categories, tags
 
-    def check_all_servers(self):
+    async def check_all_servers(self):
         try:
             if self.dev_mode:
                 print("\nStarting server checks...")
 
-            server_results = {}
-            
-            with ThreadPoolExecutor(max_workers=len(self.servers)) as executor:
-                future_to_server = {
-                    executor.submit(self.check_server, name, ip): name 
-                    for name, ip in self.servers.items()
-                }
-                
-                for future in future_to_server:
-                    server_name = future_to_server[future]
-                    try:
-                        server_results[server_name] = future.result()
-                    except Exception as e:
-                        server_results[server_name] = {
-                            'status_code': None,
-                            'status_message': str(e),
-                            'server': None,
-                            'is_ok': False
-                        }
+            checker = ServerHealthChecker(
+                self.servers, self.port, urlparse(self.base_url).hostname,
+                CONFIG['health_settings'], self.dev_mode
+            )
+            with self.metrics.span('servers', check="run"):
+                server_results = await checker.check_all()
+            for server_name, result in server_results.items():
+                for name, summary in result['timings'].items():
+                    if summary:
+                        self.metrics.record(f"server_{name}_p95_seconds", summary['p95'] / 1000, node=server_name)
+                self.metrics.record('server_up', int(result['is_ok']), node=server_name)
+            self.server_results = server_results
 
             report = "📊 Server Status:\n\n"
             all_servers_ok = True
@@ -271,28 +609,189 @@ class NewsWebsiteTest:
                 report += f"{status_emoji} {server_name}:\n"
                 report += f"  Status code: {result['status_code']}\n"
                 report += f"  Status: {result['status_message']}\n"
-                report += f"  Server: {result['server']}\n\n"
+                report += f"  Server: {result['server']}\n"
+                for name in ('ttfb', 'total'):
+                    summary = result['timings'][name]
+                    if summary:
+                        report += f"  {name.upper()} p50/p95/p99: {summary['p50']:.0f}/" \
+                                  f"{summary['p95']:.0f}/{summary['p99']:.0f} ms\n"
+                report += "\n"
                 
-                if not result['is_ok']:
+                if result['is_ok']:
+                    self.success_count += 1
+                else:
+                    self.error_count += 1
                     all_servers_ok = False
 
             if not all_servers_ok:
-                self.send_telegram_message(report)
+                self.send_error_message(report)
 
             return server_results
 
         except Exception as e:
             error_msg = f"Error checking servers: {str(e)}"
-            self.send_telegram_message(f"❌ {error_msg}")
+            self.send_error_message(f"❌ {error_msg}")
             raise Exception(error_msg)
 
-    def scroll_and_check_news(self, page, context=""):
+    async def check_web_vitals(self, page, context):
+        """
+        Collect Navigation Timing and Core Web Vitals of the current page
+        Returns: list of budget breaches
+        """
+        if not self.web_vitals['enabled']:
+            return []
+
+        vitals = await page.evaluate(WEB_VITALS_SCRIPT)
+        profile = self.get_profile()
+        budgets = {**self.web_vitals['budgets'], **(profile['budgets'] if profile else {})}
+        breaches = []
+        for name, value in vitals.items():
+            if value is None:
+                continue
+            self.metrics.record(f"web_vitals_{name}", value, check=context)
+            budget = budgets.get(name)
+            if budget is None or value <= budget:
+                continue
+            if name == 'cls':
+                breaches.append(f"cls {value:.3f} > {budget}")
+            else:
+                breaches.append(f"{name} {value:.0f} ms > {budget} ms")
+
+        if self.dev_mode:
+            print(f"Web vitals for {context}: " + ", ".join(
+                f"{name}={value:.3f}" if name == 'cls' else f"{name}={value:.0f}"
+                for name, value in vitals.items() if value is not None
+            ))
+        if breaches:
+            logging.warning(f"Performance budget exceeded for {context}: {', '.join(breaches)}")
+        return breaches
+
+    def raise_on_breaches(self, breaches):
+        if breaches:
+            raise Exception(f"Performance budget exceeded: {', '.join(breaches)}")
+
+    def report_page_result(self, page_result):
+        """Log the result of a single scrolled page as soon as it is verified"""
+        status = "OK" if not page_result['error'] else f"FAILED ({page_result['error']})"
+        message = f"{page_result['context']} page {page_result['page']}: {status}, " \
+                  f"+{page_result['posts_added']} posts ({page_result['total_posts']} total), " \
+                  f"scroll {page_result['scroll_time']:.0f} ms"
+        if page_result['analytics']:
+            message += f", GA {page_result['analytics_latency']:.0f} ms"
+            self.metrics.record('analytics_latency_seconds', page_result['analytics_latency'] / 1000,
+                                check=page_result['context'], page=page_result['page'])
+        memory = page_result['memory']
+        if memory and memory['js_heap'] is not None:
+            message += f", heap {memory['js_heap'] / 2 ** 20:.1f} MB, " \
+                       f"{memory['dom_nodes']:.0f} nodes, {memory['listeners']:.0f} listeners"
+        self.metrics.record('page_posts_added', page_result['posts_added'],
+                            check=page_result['context'], page=page_result['page'])
+
+        logging.info(message)
+        if self.dev_mode:
+            print(message)
+
+    async def open_article(self, page, url, context, result):
+        """Open the article and verify it, raises on the first problem found"""
+        with self.metrics.span('article', check=context):
+            response = await page.goto(url, timeout=self.timeouts.get('navigation', context))
+        result['status'] = response.status if response else None
+        if not response or response.status >= 400:
+            raise Exception(f"HTTP {result['status']}")
+
+        title = await page.query_selector(self.article_settings['title_selector'])
+        if not title or not (await title.inner_text()).strip():
+            raise Exception("No title")
+        article = await page.evaluate(ARTICLE_SCRIPT, self.article_settings['body_selector'])
+        if not article['body']:
+            raise Exception("No article body")
+
+        for name in ['ttfb', 'dom_content_loaded', 'load']:
+            if article[name] is not None:
+                self.metrics.record(f"article_{name}", article[name] / 1000, check=context)
+        result['load'] = article['load']
+
+        # Images cannot load when they are blocked
+        images_blocked = self.blocking['enabled'] and 'image' in self.blocking['resource_types']
+        if article['broken_images'] and not images_blocked:
+            raise Exception(f"Images failed to load: {', '.join(article['broken_images'][:3])}")
+        if article['load'] and article['load'] > self.article_settings['load_budget']:
+            raise Exception(f"load {article['load']:.0f} ms > {self.article_settings['load_budget']} ms")
+
+        if self.dev_mode:
+            print(f"✅ Article {url}: load {article['load']:.0f} ms, {article['images']} images")
+
+    async def check_article(self, browser_context, url, context):
+        """
+        Check an article in new pages of the listing's context, at most
+        article_settings.max_concurrency articles at a time. The article is a
+        check of its own: retried, counted and alerted with its own artifacts,
+        a broken article never fails its listing.
+        Returns: error message, None if the article is OK
+        """
+        name = f"Article {context}"
+        try:
+            async with self.article_semaphore:
+                for attempt in range(1, self.max_attempts + 1):
+                    result = {'context': context, 'url': url, 'status': None, 'load': None, 'error': None}
+                    page = None
+                    try:
+                        page = await self.new_page(browser_context)
+                        await self.open_article(page, url, context, result)
+                        break
+                    except Exception as e:
+                        result['error'] = f"{url}: {str(e)}"
+                        if attempt < self.max_attempts:
+                            logging.warning(f"{name} failed (attempt {attempt}/{self.max_attempts}), "
+                                            f"retrying: {result['error']}")
+                        elif page is not None:
+                            # Artifacts of the article, not of its listing
+                            screenshot = await self.make_screenshot(page, f"article_{context}_error")
+                            if screenshot:
+                                result['error'] += f"\nScreenshot: {screenshot}"
+                            trace = await self.dump_network_trace(page, f"article_{context}_error")
+                            if trace:
+                                result['error'] += f"\nNetwork trace: {trace}"
+                    finally:
+                        if page is not None:
+                            await page.close()
+                    if attempt < self.max_attempts:
+                        await asyncio.sleep(self.retry_backoff / 1000)
+        except asyncio.CancelledError:
+            # The listing failed first, its retry may sample the article again
+            self.checked_articles.discard(url)
+            raise
+
+        # Only the final attempt is recorded
+        self.article_results.append(result)
+        self.metrics.record('check_passed', int(not result['error']), check=name)
+        if result['error']:
+            self.error_count += 1
+            logging.warning(f"Article check failed ({context}): {result['error']}")
+            self.send_error_message(self.format_error_message(
+                f"{result['error']}\nFailed {self.max_attempts}/{self.max_attempts} attempts",
+                f"Ошибка в статье: {context}"
+            ))
+        else:
+            self.success_count += 1
+            if attempt > 1:
+                self.flaky_checks.append(f"{name}: {url}")
+        return result['error']
+
+    async def scroll_and_check_news(self, page, context=""):
+        profiler = None
+        article_tasks = []
         try:
             if self.dev_mode:
                 print(f"\nStarting news check: {context}")
 
-            analytics_requests = []
+            analytics_counts = {}
+            analytics_waiters = {}
             url_change_times = {}
+            loop = asyncio.get_running_loop()
+            # Slower under throttled emulation profiles
+            scroll_timeout = self.timeouts.scaled(self.scroll_timeout)
+            analytics_timeout = self.timeouts.scaled(self.analytics_timeout)
 
             def get_current_page(url):
                 """Extract page number from URL"""
@@ -303,220 +802,908 @@ class NewsWebsiteTest:
                         return 1
                 return 1
 
-            # Set up analytics request interception
-            def handle_analytics_request(route, request):
+            def get_analytics_waiter(page_num):
+                """Future resolved with the time of the first GA hit for the page"""
+                if page_num not in analytics_waiters:
+                    analytics_waiters[page_num] = loop.create_future()
+                return analytics_waiters[page_num]
+
+            def get_analytics_page(request_url, current_time):
+                """
+                Match a GA hit to a page: by its document location (dl) if present,
+                otherwise by the latest URL change within the analytics timeout
+                """
+                location = parse_qs(urlparse(request_url).query).get('dl')
+                if location:
+                    return get_current_page(location[0])
+
+                recent_changes = [
+                    (change_time, page_num) for page_num, change_time in url_change_times.items()
+                    if 0 <= current_time - change_time <= analytics_timeout / 1000
+                ]
+                if recent_changes:
+                    return max(recent_changes)[1]
+                return None
+
+            # Observe analytics requests without intercepting them
+            def handle_analytics_request(request):
                 if "www.google-analytics.com/g/collect" in request.url:
                     current_time = time.time()
-                    matching_page = None
-                    for page_num, change_time in url_change_times.items():
-                        if 0 <= current_time - change_time <= 5:
-                            matching_page = page_num
-                            break
+                    matching_page = get_analytics_page(request.url, current_time)
 
                     if matching_page:
                         if self.dev_mode:
                             print(f"✅ Detected Google Analytics request for page {matching_page}")
-                        analytics_requests.append({
-                            'url': request.url,
-                            'page': matching_page,
-                            'time': current_time
-                        })
-                route.continue_()
+                        waiter = get_analytics_waiter(matching_page)
+                        if not waiter.done():
+                            waiter.set_result(current_time)
+                        analytics_counts[matching_page] = analytics_counts.get(matching_page, 0) + 1
 
-            page.route("**/*", handle_analytics_request)
+            async def wait_for_analytics(page_num):
+                """
+                Wait for the GA hit of the page, at most analytics_timeout after the URL change
+                Returns: URL change to beacon latency in ms
+                """
+                change_time = url_change_times[page_num]
+                deadline = change_time + analytics_timeout / 1000
+                try:
+                    beacon_time = await asyncio.wait_for(
+                        asyncio.shield(get_analytics_waiter(page_num)),
+                        max(0, deadline - time.time())
+                    )
+                except asyncio.TimeoutError:
+                    raise Exception(f"No Google Analytics requests detected for page {page_num}")
+
+                latency = max(0, beacon_time - change_time) * 1000
+                self.analytics_latencies.append({
+                    'context': context,
+                    'page': page_num,
+                    'latency': latency
+                })
+                if self.dev_mode:
+                    print(f"Google Analytics latency for page {page_num}: {latency:.0f} ms")
+                return latency
 
-            # Check initial news content
-            initial_news = page.query_selector_all('.index-post-block')
+            page.on("request", handle_analytics_request)
+
+            # Install the in-page scroll driver and check initial news content
+            initial_news = await page.evaluate(SCROLL_DRIVER_SCRIPT)
             if not initial_news:
                 raise Exception("No news found on initial page load")
             
             if self.dev_mode:
-                print(f"Initial news count: {len(initial_news)}")
+                print(f"Initial news count: {initial_news}")
+
+            total_news = initial_news
 
-            def scroll_until_url_change(target_page):
+            async def sample_memory(page_num):
                 """
-                Scroll until URL changes to target page or timeout occurs
-                Returns: Boolean indicating if target page was reached
+                Record the memory of the page at a page boundary
+                Returns: sample and breaches of the growth limits since the previous boundary
                 """
-                start_time = time.time()
-                last_url = page.url
-                last_page = get_current_page(last_url)
-                scroll_count = 0
-                max_scroll_attempts = 50
-                
-                while time.time() - start_time < self.scroll_timeout:
-                    page.evaluate("""
-                        window.scrollBy(0, 300);
-                    """)
-                    page.wait_for_timeout(100)
-                    
-                    current_url = page.url
-                    current_page = get_current_page(current_url)
-                    
-                    if current_page != last_page:
-                        url_change_times[current_page] = time.time()
-                        if self.dev_mode:
-                            print(f"URL changed to page {current_page}")
-                        last_page = current_page
-
-                    if current_page == target_page:
-                        if self.dev_mode:
-                            print(f"✅ Reached target page {target_page}")
-                        page.wait_for_timeout(1000)
-                        return True
-                    
-                    current_news_count = len(page.query_selector_all('.index-post-block'))
-                    if current_news_count > len(initial_news):
-                        scroll_count = 0
-                    else:
-                        scroll_count += 1
-                    
-                    if scroll_count > max_scroll_attempts:
-                        if self.dev_mode:
-                            print(f"⚠️ Scroll limit reached while looking for page {target_page}")
-                        return False
-                    
-                    last_url = current_url
-                
-                if self.dev_mode:
-                    print(f"⚠️ Timeout while looking for page {target_page}")
-                return False
+                memory = await profiler.sample()
+                for name, value in memory.items():
+                    if value is not None:
+                        self.metrics.record(f"memory_{name}", value, check=context, page=page_num)
+                return memory, profiler.check(memory)
 
-            if not scroll_until_url_change(2):
-                raise Exception("Failed to reach page 2")
-            
-            page.wait_for_timeout(5000) 
-            page_2_analytics = [req for req in analytics_requests if req['page'] == 2]
-            if not page_2_analytics:
-                raise Exception("No Google Analytics requests detected for page 2")
+            async def sample_articles(page_num):
+                """
+                Start checking a sample of the article links on the listing,
+                spread over the remaining pages; scrolling goes on meanwhile
+                """
+                quota = self.article_settings['per_listing'] - len(article_tasks)
+                if not self.article_settings['enabled'] or quota <= 0:
+                    return
+                host = urlparse(self.base_url).hostname
+                links = [
+                    url for url in dict.fromkeys(await page.evaluate(ARTICLE_LINKS_SCRIPT))
+                    if urlparse(url).hostname == host and url not in self.checked_articles
+                ]
+                pages_left = max(1, self.max_pages - page_num + 1)
+                for url in random.sample(links, min(len(links), math.ceil(quota / pages_left))):
+                    self.checked_articles.add(url)
+                    article_tasks.append(asyncio.create_task(self.check_article(page.context, url, context)))
+
+            await sample_articles(1)
+
+            if self.memory_settings['enabled']:
+                profiler = MemoryProfiler(page, self.memory_settings)
+                await profiler.start()
+                await sample_memory(1)
+
+            async def scroll_until_url_change(target_page):
+                """
+                Scroll in the page until URL changes to target page or timeout occurs
+                Returns: dict with reached flag, time taken, posts added and scroll distance
+                """
+                result = await page.evaluate(
+                    "([targetPage, options]) => window.__scrollDriver.scrollTo(targetPage, options)",
+                    [target_page, {
+                        'timeout': scroll_timeout,
+                        'step': self.scroll_step,
+                        'interval': self.scroll_interval,
+                        'maxIdleSteps': self.max_idle_scrolls
+                    }]
+                )
+
+                if result['reached']:
+                    url_change_times[target_page] = result['changeTime'] / 1000
+                    if self.dev_mode:
+                        print(f"✅ Reached target page {target_page} in {result['time']:.0f} ms, "
+                              f"{result['postsAdded']} new posts, scrolled {result['scrollDistance']} px")
+                elif self.dev_mode:
+                    print(f"⚠️ {result['reason']} while looking for page {target_page}")
+                return result
 
-            if not scroll_until_url_change(3):
-                raise Exception("Failed to reach page 3")
-            
-            page.wait_for_timeout(5000)
-            page_3_analytics = [req for req in analytics_requests if req['page'] == 3]
-            if not page_3_analytics:
-                raise Exception("No Google Analytics requests detected for page 3")
+            async def verify_pages():
+                """
+                Scroll page by page up to max_pages
+                Yields: one result per page, stops after the first failed page
+                """
+                for target_page in range(2, self.max_pages + 1):
+                    with self.metrics.span('scroll', check=context, page=target_page):
+                        scroll_result = await scroll_until_url_change(target_page)
+                    page_result = {
+                        'context': context,
+                        'page': target_page,
+                        'reached': scroll_result['reached'],
+                        'scroll_time': scroll_result['time'],
+                        'scroll_distance': scroll_result['scrollDistance'],
+                        'posts_added': scroll_result['postsAdded'],
+                        'total_posts': scroll_result['totalPosts'],
+                        'analytics': False,
+                        'analytics_latency': None,
+                        'memory': None,
+                        'error': None
+                    }
+
+                    if not scroll_result['reached']:
+                        page_result['error'] = f"Failed to reach page {target_page}: {scroll_result['reason']}"
+                    else:
+                        try:
+                            with self.metrics.span('analytics_wait', check=context, page=target_page):
+                                page_result['analytics_latency'] = await wait_for_analytics(target_page)
+                            page_result['analytics'] = True
+                        except Exception as e:
+                            page_result['error'] = str(e)
+
+                    if profiler and not page_result['error']:
+                        page_result['memory'], breaches = await sample_memory(target_page)
+                        if breaches:
+                            page_result['error'] = f"Memory growth on page {target_page}: {', '.join(breaches)}"
+
+                    yield page_result
+                    if page_result['error']:
+                        return
+
+            async for page_result in verify_pages():
+                self.report_page_result(page_result)
+                if page_result['error']:
+                    raise Exception(page_result['error'])
+                total_news = page_result['total_posts']
+                await sample_articles(page_result['page'])
+
+            # Articles sampled while scrolling are checks of their own,
+            # they only have to finish before the listing's context is closed
+            await asyncio.gather(*article_tasks)
 
-            # Total news counting
-            total_news = len(page.query_selector_all('.index-post-block'))
-            
             if self.dev_mode:
                 print(f"Total news found: {total_news}")
                 print(f"Final URL: {page.url}")
                 print("Analytics requests summary:")
-                for page_num in sorted(set(req['page'] for req in analytics_requests)):
-                    page_reqs = [req for req in analytics_requests if req['page'] == page_num]
-                    print(f"Page {page_num}: {len(page_reqs)} requests")
+                for page_num in sorted(analytics_counts):
+                    print(f"Page {page_num}: {analytics_counts[page_num]} requests")
 
             return total_news
 
         except Exception as e:
             raise Exception(f"Error during scroll check: {str(e)}")
-
-    def check_main_page(self, page):
+        finally:
+            page.remove_listener("request", handle_analytics_request)
+            if profiler:
+                await profiler.close()
+            for task in article_tasks:
+                task.cancel()
+            await asyncio.gather(*article_tasks, return_exceptions=True)
+
+    async def check_main_page(self, page):
         try:
             if self.dev_mode:
                 print("Checking the main page...")
-            page.wait_for_selector('.main-slider', timeout=5000)
+            with self.metrics.span('navigation', check="Main page"):
+                await page.goto(self.base_url, timeout=self.timeouts.get('navigation', "Main page"))
+            with self.metrics.span('render', check="Main page"):
+                await page.wait_for_selector('.main-slider', timeout=self.timeouts.get('render', "Main page"))
+            breaches = await self.check_web_vitals(page, "Main page")
             
             # Check news by scrolling to the third page
-            total_news = self.scroll_and_check_news(page, "Main page")
+            total_news = await self.scroll_and_check_news(page, "Main page")
             
             if total_news == 0:
                 raise Exception("No news on the main page")
+            self.raise_on_breaches(breaches)
             if self.dev_mode:
                 print(f"Total news found on the main page: {total_news}")
                 
         except Exception as e:
-            screenshot = self.make_screenshot(page, "main_page_error")
+            screenshot = await self.make_screenshot(page, "main_page_error")
             error_msg = f"Error checking the main page: {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, "main_page_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
 
-    def check_category(self, page, category):
+    async def check_category(self, page, category):
         try:
             if self.dev_mode:
                 print(f"\nChecking category: {category}")
-            page.goto(f"{self.base_url}/{category}")
-            page.wait_for_selector('.main-posts-title', timeout=5000)
+            with self.metrics.span('navigation', check=f"Category {category}"):
+                await page.goto(f"{self.base_url}/{category}",
+                                timeout=self.timeouts.get('navigation', f"Category {category}"))
+            with self.metrics.span('render', check=f"Category {category}"):
+                await page.wait_for_selector('.main-posts-title',
+                                             timeout=self.timeouts.get('render', f"Category {category}"))
+            breaches = await self.check_web_vitals(page, f"Category {category}")
             
             # Check news by scrolling to the third page
-            total_news = self.scroll_and_check_news(page, f"Category {category}")
+            total_news = await self.scroll_and_check_news(page, f"Category {category}")
             
             if total_news == 0:
                 raise Exception(f"No news in the {category} category")
+            self.raise_on_breaches(breaches)
             if self.dev_mode:
                 print(f"Total news found in the {category} category: {total_news}")
                 
         except Exception as e:
-            screenshot = self.make_screenshot(page, f"category_{category}_error")
+            screenshot = await self.make_screenshot(page, f"category_{category}_error")
             error_msg = f"Error checking the {category} category: {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, f"category_{category}_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
         
-    def check_tag(self, page, tag):
+    async def check_tag(self, page, tag):
         try:
             if self.dev_mode:
                 print(f"\nChecking category: {tag}")
-            page.goto(f"{self.base_url}/{tag}")
-            page.wait_for_selector('.main-posts-title', timeout=5000)
+            with self.metrics.span('navigation', check=f"tag {tag}"):
+                await page.goto(f"{self.base_url}/{tag}", timeout=self.timeouts.get('navigation', f"tag {tag}"))
+            with self.metrics.span('render', check=f"tag {tag}"):
+                await page.wait_for_selector('.main-posts-title', timeout=self.timeouts.get('render', f"tag {tag}"))
+            breaches = await self.check_web_vitals(page, f"tag {tag}")
             
             # Check news by scrolling to the third page
-            total_news = self.scroll_and_check_news(page, f"tag {tag}")
+            total_news = await self.scroll_and_check_news(page, f"tag {tag}")
             
             if total_news == 0:
                 raise Exception(f"No news in the {tag} tag")
+            self.raise_on_breaches(breaches)
             if self.dev_mode:
                 print(f"Total news found in the {tag} tag: {total_news}")
                 
         except Exception as e:
-            screenshot = self.make_screenshot(page, f"tag_{tag}_error")
+            screenshot = await self.make_screenshot(page, f"tag_{tag}_error")
             error_msg = f"Error checking the {tag} tag: {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, f"tag_{tag}_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
 
 
-    def check_search(self, page):
+    def load_search_baselines(self):
+        """Read the baseline result counts of the search terms from the history store"""
+        if not self.history_settings['enabled']:
+            return
+        try:
+            history = HistoryStore(self.history_settings)
+            try:
+                self.search_baselines = history.baseline_medians('search_results_count')
+            finally:
+                history.close()
+        except Exception as e:
+            logging.error(f"Error loading search baselines: {str(e)}")
+
+    def check_search_drift(self, name, total_news):
+        """
+        Returns: breach if the result count collapsed below drift_ratio x the baseline median
+        """
+        baseline = self.search_baselines.get(series_name(name, self.metrics.get_labels()))
+        if not baseline or baseline[0] < self.search_settings['min_samples']:
+            return None
+        limit = baseline[1] * self.search_settings['drift_ratio']
+        if total_news < limit:
+            return f"results {total_news} < {limit:.0f} (baseline median {baseline[1]:.0f})"
+        return None
+
+    async def check_search(self, page, search_term):
+        name = f"Search {search_term}"
         try:
             if self.dev_mode:
-                print("\nChecking the search...")
-            
-            # Open the search
-            self.safe_click(page, '.custom-navbar-search-toggle')
-            page.wait_for_timeout(300)
-            
-            # Enter the search query
-            search_term = "ilham əliyev"
-            page.fill('.custom-navbar-search-form form input', search_term)
-            page.press('.custom-navbar-search-form form', 'Enter')
-            
-            page.wait_for_selector('.main-posts-title', timeout=5000)
-            
-            news_items = page.query_selector_all('.index-post-block')
+                print(f"\nChecking the search: {search_term}")
+
+            if self.search_settings['mode'] == 'url':
+                # Open the search results URL directly
+                query = urlencode({self.search_settings['query_param']: search_term})
+                start_time = time.perf_counter()
+                with self.metrics.span('search_results', check=name):
+                    await page.goto(f"{self.base_url}{self.search_settings['path']}?{query}",
+                                    timeout=self.timeouts.get('navigation', name))
+                    await page.wait_for_selector('.main-posts-title',
+                                                 timeout=self.timeouts.get('search_results', name))
+            else:
+                with self.metrics.span('navigation', check=name):
+                    await page.goto(self.base_url, timeout=self.timeouts.get('navigation', name))
+
+                # Open the search
+                with self.metrics.span('open_search', check=name):
+                    await self.safe_click(page, '.custom-navbar-search-toggle')
+                    await page.wait_for_timeout(300)
+
+                # Enter the search query
+                await page.fill('.custom-navbar-search-form form input', search_term)
+                start_time = time.perf_counter()
+                with self.metrics.span('search_results', check=name):
+                    # The page that opened the search has the same title and
+                    # posts: wait for the results URL before looking at them
+                    async with page.expect_navigation(url=f"**{self.search_settings['path']}?*",
+                                                      wait_until='domcontentloaded',
+                                                      timeout=self.timeouts.get('search_results', name)):
+                        await page.press('.custom-navbar-search-form form input', 'Enter')
+                    await page.wait_for_selector('.main-posts-title',
+                                                 timeout=self.timeouts.get('search_results', name))
+            # Query to the results page. Results are counted only once the page
+            # is rendered, so an empty result is recorded as 0 and reported,
+            # not left to a selector timeout
+            latency = (time.perf_counter() - start_time) * 1000
+
+            news_items = await page.query_selector_all('.index-post-block')
             total_news = len(news_items)
-            
+            self.metrics.record('search_results_count', total_news, check=name)
+
             if total_news == 0:
                 raise Exception("Search results is empty")
-            
+
+            breaches = await self.check_web_vitals(page, name)
+            if latency > self.search_settings['latency_budget']:
+                breaches.append(f"results page {latency:.0f} ms > {self.search_settings['latency_budget']} ms")
+            drift = self.check_search_drift(name, total_news)
+            if drift:
+                breaches.append(drift)
+            self.raise_on_breaches(breaches)
+
             if self.dev_mode:
-                print(f"Search results first page: {total_news}")
-                
+                print(f"Search results first page for {search_term}: {total_news}, results page in {latency:.0f} ms")
+
         except Exception as e:
-            screenshot = self.make_screenshot(page, "search_error")
-            error_msg = f"Search error: {str(e)}"
+            screenshot = await self.make_screenshot(page, f"search_{search_term}_error")
+            error_msg = f"Search error ({search_term}): {str(e)}"
             if screenshot:
                 error_msg += f"\nScreenshot: {screenshot}"
+            trace = await self.dump_network_trace(page, f"search_{search_term}_error")
+            if trace:
+                error_msg += f"\nNetwork trace: {trace}"
             raise Exception(error_msg)
 
+    def is_domain_in(self, host, domains):
+        return any(host == domain or host.endswith(f".{domain}") for domain in domains)
 
+    async def handle_blocked_request(self, route, request):
+        """Abort heavy resources and ad domains, Google Analytics always passes"""
+        host = urlparse(request.url).hostname or ''
+        if self.is_domain_in(host, self.blocking['allowed_domains']):
+            await route.continue_()
+        elif request.resource_type in self.blocking['resource_types'] \
+                or self.is_domain_in(host, self.blocking['blocked_domains']):
+            await route.abort()
+        else:
+            await route.continue_()
 
+    def run_http_tier(self, sections):
+        from http_tier import HttpTier
 
-    def run_tests(self):
+        http_tier = HttpTier(self.base_url, self.max_pages, CONFIG['http_tier_settings'], self.dev_mode)
+        try:
+            return http_tier.check_sections(sections)
+        finally:
+            http_tier.close()
+
+    def select_browser_sections(self, sections, slot):
+        """
+        Sections of the current rotation slot for the browser checks,
+        plus every section that failed the HTTP tier
+        """
+        failed = [section for section in sections
+                  if section in self.http_results and not self.http_results[section]['is_ok']]
+        rotation = [section for section in self.discovery.select(sections, slot) if section not in failed]
+        return failed + rotation
+
+    def get_error_context(self, prefix, section):
+        error_context = f"{prefix}: {section}"
+        if section in self.http_results and not self.http_results[section]['is_ok']:
+            error_context += f" (HTTP tier: {self.http_results[section]['error']})"
+        return error_context
+
+    def apply_profile(self, profile):
+        """
+        Run the checks of the current task under the emulation profile; metrics of
+        profiles other than the first one are labelled with the profile name
+        """
+        self.current_profile.set(profile)
+        self.timeouts.set_scale(self.emulation['definitions'][profile]['timeout_factor'])
+        if profile != self.emulation['profiles'][0]:
+            self.metrics.set_labels(profile=profile)
+
+    def get_profile(self):
+        """Definition of the emulation profile of the current task, None outside of checks"""
+        profile = self.current_profile.get()
+        return self.emulation['definitions'][profile] if profile else None
+
+    def get_context_options(self):
+        options = {'viewport': {"width": 1920, "height": 1080}}
+        profile = self.get_profile()
+        if not profile:
+            return options
+
+        if profile['device']:
+            if profile['device'] not in self.devices:
+                raise Exception(f"Unknown device descriptor: {profile['device']}")
+            options = {key: value for key, value in self.devices[profile['device']].items()
+                       if key != 'default_browser_type'}
+        if profile.get('viewport'):
+            options['viewport'] = profile['viewport']
+        return options
+
+    async def new_context(self, browser):
+        context = await browser.new_context(**self.get_context_options())
+        if self.web_vitals['enabled']:
+            await context.add_init_script(WEB_VITALS_INIT_SCRIPT)
+        if self.blocking['enabled']:
+            await context.route("**/*", self.handle_blocked_request)
+        return context
+
+    async def run_check(self, browser, semaphore, check, args, name, error_context, profile):
+        """
+        Run a single check in its own browser context under the emulation profile.
+        Concurrency is bounded by the shared semaphore.
+        """
+        self.apply_profile(profile)
+        if profile != self.emulation['profiles'][0]:
+            name_in_report = f"{name} [{profile}]"
+        else:
+            name_in_report = name
+        profile_result = self.profile_results.setdefault(profile, {'success': 0, 'error': 0, 'durations': []})
+
+        async with semaphore:
+            start_time = time.time()
+            for attempt in range(1, self.max_attempts + 1):
+                context = None
+                try:
+                    # Inside the try: a dead browser fails this check, not the whole run
+                    context = await self.new_context(browser)
+                    page = await self.new_page(context)
+                    with self.metrics.span('check', check=name):
+                        await check(page, *args)
+                    break
+                except Exception as e:
+                    error = e
+                    if attempt < self.max_attempts:
+                        logging.warning(f"{name_in_report} failed (attempt {attempt}/{self.max_attempts}), "
+                                        f"retrying: {str(e)}")
+                        await asyncio.sleep(self.retry_backoff / 1000)
+                finally:
+                    if context is not None:
+                        await context.close()
+            else:
+                # Hard failure: every attempt failed
+                self.error_count += 1
+                self.metrics.record('check_attempts', self.max_attempts, check=name)
+                self.metrics.record('check_passed', 0, check=name)
+                error_message = self.format_error_message(
+                    f"{str(error)}\nFailed {self.max_attempts}/{self.max_attempts} attempts", error_context
+                )
+                self.send_error_message(error_message)
+                profile_result['error'] += 1
+                return False
+
+            if attempt > 1:
+                # Flaky: passed after a retry, reported in the summary only
+                self.flaky_checks.append(name_in_report)
+                logging.warning(f"{name_in_report} passed on attempt {attempt}/{self.max_attempts}")
+            self.metrics.record('check_attempts', attempt, check=name)
+            self.metrics.record('check_passed', 1, check=name)
+            self.success_count += 1
+            profile_result['success'] += 1
+            profile_result['durations'].append(time.time() - start_time)
+            return True
+
+    def build_checks(self, node=None):
+        """
+        Main page, selected categories and tags, and every search term,
+        once per emulation profile
+        Returns: list of (check, args, name, error_context, profile)
+        """
+        checks = [(self.check_main_page, (), "Main page", "Ошибка на главной странице")]
+        for category in self.categories:
+            checks.append((self.check_category, (category,), f"Category {category}",
+                           self.get_error_context("Ошибка в категории", category)))
+        for tag in self.tags:
+            checks.append((self.check_tag, (tag,), f"tag {tag}",
+                           self.get_error_context("Ошибка в теге", tag)))
+        for search_term in self.search_settings['terms']:
+            checks.append((self.check_search, (search_term,), f"Search {search_term}",
+                           self.get_error_context("Ошибка в поиске", search_term)))
+        if self.check_kinds is not None:
+            checks = [check for check in checks if check[0].__name__ in self.check_kinds]
+
+        if node:
+            checks = [(check, args, name, f"{node}: {error_context}")
+                      for check, args, name, error_context in checks]
+
+        profiles = self.emulation['profiles']
+        return [
+            (check, args, name, error_context if profile == profiles[0] else f"{error_context} [{profile}]", profile)
+            for profile in profiles
+            for check, args, name, error_context in checks
+        ]
+
+    async def run_browser_checks(self, browser, node=None):
+        """
+        Every check in its own context, at most max_concurrency at a time
+        across all browsers. With a node, the results are also recorded per node.
+        """
+        start_time = time.time()
+        if node:
+            self.metrics.set_labels(node=node)
+        results = await asyncio.gather(*[
+            self.run_check(browser, self.check_semaphore, *check)
+            for check in self.build_checks(node)
+        ])
+
+        if node:
+            self.node_results[node] = {
+                'success': results.count(True),
+                'error': results.count(False),
+                'duration': time.time() - start_time
+            }
+
+    def get_launch_options(self, args=None):
+        browser_launch_options = {
+            "headless": True if not self.dev_mode else False,
+        }
+
+        if self.dev_mode:
+            browser_launch_options.update({"devtools": True})
+        args = CONFIG['browser_settings']['args'] + (args or [])
+        if args:
+            browser_launch_options.update({"args": args})
+
+        return browser_launch_options
+
+    async def run_pinned_checks(self, playwright, server_name, server_ip):
+        """
+        Run the browser checks with every site host resolved to a single node,
+        at most pinning_settings.max_browsers nodes at a time
+        """
+        rules = ", ".join(f"MAP {host} {server_ip}" for host in self.pinning['hosts'])
+        async with self.browser_semaphore:
+            browser = await playwright.chromium.launch(
+                **self.get_launch_options([f"--host-resolver-rules={rules}"])
+            )
+            try:
+                await self.run_browser_checks(browser, server_name)
+            finally:
+                await browser.close()
+
+    def build_shard_units(self):
+        """
+        Checks as picklable units for the shard workers, one per node
+        and check in the node pinning mode
+        Returns: list of (method name, args, name, error_context, profile, node)
+        """
+        nodes = list(self.servers) if self.pinning['enabled'] else [None]
+        return [
+            (check.__name__, args, name, error_context, profile, node)
+            for node in nodes
+            for check, args, name, error_context, profile in self.build_checks(node)
+        ]
+
+    async def run_sharded_checks(self):
+        """Run the checks in shard worker processes and merge their results"""
+        shards = plan_shards(self.build_shard_units(), self.shards)
+        results = await run_shards(run_shard, shards, CONFIG)
+
+        for shard_id, (units, (result, duration)) in enumerate(zip(shards, results), 1):
+            if isinstance(result, Exception):
+                # The whole shard is lost, every check counts as failed
+                result = {'success_count': 0, 'error_count': len(units), 'flaky_checks': [], 'profile_results': {},
+                          'analytics_latencies': [], 'article_results': [], 'node_results': {}, 'samples': [],
+                          'errors': [self.format_error_message(result, f"Shard {shard_id}")]}
+
+            self.success_count += result['success_count']
+            self.error_count += result['error_count']
+            self.flaky_checks.extend(result['flaky_checks'])
+            self.analytics_latencies.extend(result['analytics_latencies'])
+            self.article_results.extend(result['article_results'])
+            for profile, profile_result in result['profile_results'].items():
+                merged = self.profile_results.setdefault(profile, {'success': 0, 'error': 0, 'durations': []})
+                merged['success'] += profile_result['success']
+                merged['error'] += profile_result['error']
+                merged['durations'].extend(profile_result['durations'])
+            self.metrics.samples.extend(result['samples'])
+            for message in result['errors']:
+                self.send_error_message(message)
+            for node, node_result in result['node_results'].items():
+                merged = self.node_results.setdefault(node, {'success': 0, 'error': 0, 'duration': 0})
+                merged['success'] += node_result['success']
+                merged['error'] += node_result['error']
+                merged['duration'] = max(merged['duration'], node_result['duration'])
+
+            self.metrics.record('shard_duration_seconds', duration, shard=shard_id)
+            self.shard_results.append({
+                'shard': shard_id,
+                'checks': len(units),
+                'success': result['success_count'],
+                'error': result['error_count'],
+                'duration': duration
+            })
+
+    async def run_shard_async(self, units):
+        """
+        Run the units of one shard with this worker's own browsers,
+        one per node in the node pinning mode
+        Returns: results to merge in the coordinator
+        """
+        self.reset_run_state()
+        self.shard_errors = []
+        start_time = time.time()
+        self.timeouts.load()
+        self.load_search_baselines()
+
+        async with async_playwright() as p:
+            self.devices = p.devices
+
+            async def run_unit(browser, method, args, name, error_context, profile, node):
+                if node:
+                    self.metrics.set_labels(node=node)
+                passed = await self.run_check(browser, self.check_semaphore, getattr(self, method), args,
+                                              name, error_context, profile)
+                if node:
+                    result = self.node_results.setdefault(node, {'success': 0, 'error': 0, 'duration': 0})
+                    result['success' if passed else 'error'] += 1
+                    result['duration'] = time.time() - start_time
+
+            async def run_node(node, node_units):
+                """Units of one node in their own browser, at most max_browsers nodes at a time"""
+                args = None
+                if node:
+                    rules = ", ".join(f"MAP {host} {self.servers[node]}" for host in self.pinning['hosts'])
+                    args = [f"--host-resolver-rules={rules}"]
+                async with self.browser_semaphore:
+                    browser = await p.chromium.launch(**self.get_launch_options(args))
+                    try:
+                        await asyncio.gather(*[run_unit(browser, *unit) for unit in node_units])
+                    finally:
+                        await browser.close()
+
+            nodes = {}
+            for unit in units:
+                nodes.setdefault(unit[-1], []).append(unit)
+            await asyncio.gather(*[run_node(node, node_units) for node, node_units in nodes.items()])
+
+        await asyncio.to_thread(self.screenshots.flush)
+        await asyncio.to_thread(self.notifier.close)
+        return {
+            'success_count': self.success_count,
+            'error_count': self.error_count,
+            'flaky_checks': self.flaky_checks,
+            'analytics_latencies': self.analytics_latencies,
+            'article_results': self.article_results,
+            'profile_results': self.profile_results,
+            'node_results': self.node_results,
+            'samples': self.metrics.samples,
+            'errors': self.shard_errors
+        }
+
+    def run_tests(self, mode='browser', section=None):
+        asyncio.run(self.run_tests_async(mode, section))
+
+    def run_daemon(self, mode='browser', section=None):
+        asyncio.run(self.run_daemon_async(mode, section))
+
+    def run_load_test(self):
+        asyncio.run(self.run_load_test_async())
+
+    def reset_run_state(self):
+        """Clear the results of the previous run, the daemon reuses the instance"""
+        self.success_count = 0
+        self.error_count = 0
+        self.http_results = {}
+        self.server_results = {}
+        self.node_results = {}
+        self.flaky_checks = []
+        self.analytics_latencies = []
+        self.shard_results = []
+        self.profile_results = {}
+        self.check_kinds = None
+        self.article_results = []
+        self.checked_articles = set()
+        # Pool shared by the article checks of all listings
+        self.article_semaphore = asyncio.Semaphore(self.article_settings['max_concurrency'])
+        # max_concurrency is shared by the browsers of all nodes
+        self.check_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.browser_semaphore = asyncio.Semaphore(self.pinning['max_browsers'])
+
+    async def start_playwright(self):
+        """Start Playwright on first use, modes without a browser never import it"""
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+            self.devices = self.playwright.devices
+        return self.playwright
+
+    async def stop_playwright(self):
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def run_tests_async(self, mode='browser', section=None):
+        launched = []
+
+        async def launch_browser():
+            if not launched:
+                playwright = await self.start_playwright()
+                launched.append(await playwright.chromium.launch(**self.get_launch_options()))
+            return launched[0]
+
+        try:
+            await self.run_cycle(launch_browser, mode, section)
+        finally:
+            # Закрытие браузера
+            if self.dev_mode and launched:
+                input("Тест завершён. Нажмите Enter для закрытия.")
+            for browser in launched:
+                await browser.close()
+            await self.stop_playwright()
+
+    async def run_daemon_async(self, mode='browser', section=None):
+        """
+        Run the checks every interval seconds plus up to jitter seconds on a
+        warm browser until SIGINT or SIGTERM
+        """
+        settings = self.daemon_settings
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        browser = WarmBrowser(self.start_playwright, self.get_launch_options(), settings)
+        try:
+            while not stop.is_set():
+                cycle_start = time.monotonic()
+                try:
+                    await self.run_cycle(browser.get, mode, section)
+                except Exception as e:
+                    logging.error(f"Daemon: run failed: {str(e)}")
+                await browser.finish_run()
+
+                delay = settings['interval'] + random.uniform(0, settings['jitter'])
+                delay -= time.monotonic() - cycle_start
+                try:
+                    await asyncio.wait_for(stop.wait(), max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await browser.close()
+            await self.stop_playwright()
+            await asyncio.to_thread(self.notifier.close)
+
+    async def run_load_test_async(self):
+        """
+        Load the origin nodes with the URL mix of the discovered categories
+        and tags, the browser is launched only if the discovery cache expired
+        """
+        cached = self.discovery.get_cached()
+        if cached:
+            categories, tags = cached
+        else:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(**self.get_launch_options())
+
+                async def get_browser():
+                    return browser
+
+                try:
+                    categories, tags = await self.discover_sections(get_browser)
+                finally:
+                    await browser.close()
+
+        paths, weights = build_url_mix(categories, tags, self.max_pages)
+        tester = LoadTester(
+            self.servers, self.port, urlparse(self.base_url).hostname,
+            CONFIG['load_settings'], self.dev_mode
+        )
+        results = await tester.run(paths, weights)
+
+        for server_name, result in results.items():
+            self.metrics.set_labels(node=server_name)
+            self.metrics.record('load_requests', result['requests'])
+            self.metrics.record('load_throughput', result['throughput'])
+            self.metrics.record('load_error_rate', result['error_rate'])
+            for name, value in (result['latency'] or {}).items():
+                if name != 'count':
+                    self.metrics.record('load_latency_seconds', value / 1000, quantile=name)
+
+        report = format_load_report(results)
+        logging.info(report)
+        if self.dev_mode:
+            print(report)
+        self.send_telegram_message(report)
+        await asyncio.to_thread(self.notifier.close)
+        self.metrics.export('load')
+
+    def report_http_results(self):
+        """Count every HTTP-tier section as a check and alert on the failed ones"""
+        for section, result in self.http_results.items():
+            if result['is_ok']:
+                self.success_count += 1
+                continue
+            self.error_count += 1
+            self.send_error_message(self.format_error_message(result['error'], f"HTTP tier: {section}"))
+
+    def select_single_section(self, section):
+        """Checks of the section mode: main, search, a category or a tag"""
+        self.categories = []
+        self.tags = []
+        if section == 'main':
+            self.check_kinds = {'check_main_page'}
+        elif section == 'search':
+            self.check_kinds = {'check_search'}
+        else:
+            cached = self.discovery.get_cached()
+            if (cached and section in cached[1]) or section.startswith('tag/'):
+                self.tags = [section]
+                self.check_kinds = {'check_tag'}
+            else:
+                self.categories = [section]
+                self.check_kinds = {'check_category'}
+
+    async def run_all_browser_checks(self, get_browser):
+        # Главная страница, категории, теги и поиск - каждая проверка
+        # в своём контексте, не более max_concurrency одновременно.
+        # В режиме привязки к нодам - отдельный браузер на каждую ноду.
+        # С шардированием - проверки распределяются по процессам
+        if self.shards > 1:
+            with self.metrics.span('browser_checks', check="run"):
+                await self.run_sharded_checks()
+        elif self.pinning['enabled']:
+            playwright = await self.start_playwright()
+            await asyncio.gather(*[
+                self.run_pinned_checks(playwright, name, ip) for name, ip in self.servers.items()
+            ])
+        else:
+            with self.metrics.span('browser_checks', check="run"):
+                await self.run_browser_checks(await get_browser())
+
+    async def run_cycle(self, get_browser, mode='browser', section=None):
+        """
+        One run of the checks of the mode, get_browser() returns the browser to use:
+        a new one for a single run, the warm one in daemon mode.
+        Modes: browser - all checks, servers - origin nodes only, http - HTTP tier
+        of every section, section - browser checks of a single section
+        """
+        self.reset_run_state()
+        self.mode = mode
         self.start_time = time.time()
+        if mode in ('browser', 'section'):
+            # Only the browser checks use them, servers and http runs stay fast
+            self.timeouts.load()
+            self.load_search_baselines()
 
         # Отправка первого сообщения
         try:
@@ -534,91 +1721,65 @@ class NewsWebsiteTest:
             logging.error(f"Ошибка при отправке первого сообщения: {str(e)}")
             return
 
-        # Запуск браузера Playwright
-        with sync_playwright() as p:
-            browser_launch_options = {
-                "headless": True if not self.dev_mode else False,
-            }
+        # Проверка серверов идёт параллельно с остальными проверками
+        servers_task = None
+        if mode in ('browser', 'servers'):
+            servers_task = asyncio.create_task(self.check_all_servers())
 
-            if self.dev_mode:
-                browser_launch_options.update({"devtools": True})
-
-            browser = p.chromium.launch(**browser_launch_options)
-            context = browser.new_context(viewport={"width": 1920, "height": 1080})
-            page = context.new_page()
-
-            try:
-                # Переход на сайт
-                page.goto(self.base_url)
-
-                # Получение категорий и тегов
-                self.categories = self.get_categories(page)
-                self.tags = self.get_tags(page)
-                self.success_count += 1
-
-                # Тест главной страницы
-                self.check_main_page(page)
-                self.success_count += 1
-
-                # Тест категорий
-                for category in self.categories:
-                    try:
-                        self.check_category(page, category)
-                        self.success_count += 1
-                    except Exception as e:
-                        self.error_count += 1
-                        error_message = self.format_error_message(e, f"Ошибка в категории: {category}")
-                        self.send_telegram_message(error_message)
-
-                # Тест тегов
-                for tag in self.tags:
-                    try:
-                        self.check_tag(page, tag)
-                        self.success_count += 1
-                    except Exception as e:
-                        self.error_count += 1
-                        error_message = self.format_error_message(e, f"Ошибка в теге: {tag}")
-                        self.send_telegram_message(error_message)
-
-                # Тест поиска
-                try:
-                    self.check_search(page)
-                    self.success_count += 1
-                except Exception as e:
-                    self.error_count += 1
-                    error_message = self.format_error_message(e, "Ошибка в поиске")
-                    self.send_telegram_message(error_message)
-
-            except Exception as e:
-                self.error_count += 1
-                error_message = self.format_error_message(e, "Общая ошибка тестирования")
-                self.send_telegram_message(error_message)
-                logging.error(error_message)
-
-            finally:
-                # Отправка отчёта
-                self.send_test_report()
+        try:
+            if mode in ('browser', 'http'):
+                # Получение категорий и тегов (из кэша, если он не устарел),
+                # браузер запускается только если нужно обновить кэш
+                with self.metrics.span('discovery', check="run"):
+                    categories, tags = await self.discover_sections(get_browser)
+
+                # HTTP-проверка всех категорий и тегов, в браузере - очередная
+                # часть ротации и всё, что не прошло HTTP-проверку
+                if self.http_tier_enabled or mode == 'http':
+                    with self.metrics.span('http_tier', check="run"):
+                        self.http_results = await asyncio.to_thread(self.run_http_tier, categories + tags)
+                if mode == 'http':
+                    # No browser re-check follows: the HTTP tier is the result
+                    self.report_http_results()
+
+            if mode == 'browser':
+                slot = self.discovery.next_slot()
+                self.categories = self.select_browser_sections(categories, slot)
+                self.tags = self.select_browser_sections(tags, slot)
+                await self.run_all_browser_checks(get_browser)
+            elif mode == 'section':
+                self.select_single_section(section)
+                await self.run_all_browser_checks(get_browser)
 
-                # Закрытие браузера
-                if not self.dev_mode:
-                    context.close()
-                    browser.close()
-                else:
-                    input("Тест завершён. Нажмите Enter для закрытия.")
-                    context.close()
-                    browser.close()
+        except Exception as e:
+            self.error_count += 1
+            error_message = self.format_error_message(e, "Общая ошибка тестирования")
+            self.send_error_message(error_message)
+            logging.error(error_message)
+
+        finally:
+            if servers_task is not None:
+                await asyncio.gather(servers_task, return_exceptions=True)
+
+            # Отправка отчёта, дожидаемся доставки всех сообщений
+            self.send_test_report()
+            with self.metrics.span('telegram', check="run"):
+                await asyncio.to_thread(self.notifier.flush)
+            await asyncio.to_thread(self.screenshots.flush)
+            self.metrics.export(mode)
+
+
+def run_shard(shard_id, units, config):
+    """Entry point of a shard worker process"""
+    # The coordinator's CONFIG may differ from config.py, e.g. in the benchmark
+    CONFIG.clear()
+    CONFIG.update(config)
+    logging.info(f"Shard {shard_id}: {len(units)} checks")
+    test = NewsWebsiteTest()
+    return asyncio.run(test.run_shard_async(units))
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        filename='news_website_test.log'
-    )
-    
-    test = NewsWebsiteTest()
-    
-    # telegram connect test
-    
+    from cli import main
 
-    test.run_tests()
+    main()
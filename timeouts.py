@@ -0,0 +1,101 @@
+import contextvars
+import logging
+from history import HistoryStore, series_name, series_profile
+from stats import percentile
+
+
+class TimeoutPolicy:
+    """
+    Per-check timeouts derived from the latency observed in the run history:
+    p99 x factor within the phase limits, the configured default until
+    enough samples are collected
+    """
+
+    def __init__(self, settings, history_settings, get_labels=dict):
+        self.adaptive = settings['adaptive'] and history_settings['enabled']
+        self.factor = settings['factor']
+        self.min_samples = settings['min_samples']
+        self.window = settings['window']
+        self.defaults = settings['defaults']
+        self.limits = settings['limits']
+        self.history_settings = history_settings
+        # Metric labels of the current task (node, profile): checks are
+        # looked up under the same series names the history stores
+        self.get_labels = get_labels
+        # (check, phase) -> (count, p99 in ms)
+        self.observed = {}
+        # (profile, phase) -> (count, p99 in ms) of all checks under the profile,
+        # throttled samples never mix with the first profile's
+        self.pooled = {}
+        # Multiplier of the timeouts of the current task, e.g. under a throttled emulation profile
+        self.scale = contextvars.ContextVar('timeout_scale', default=1)
+
+    def set_scale(self, scale):
+        self.scale.set(scale)
+
+    def load(self):
+        """Read the p99 latencies of every check phase from the history store"""
+        if not self.adaptive:
+            return
+
+        try:
+            history = HistoryStore(self.history_settings)
+            try:
+                # Only the phases with a timeout, not every sample of the window
+                rows = history.recent_values(list(self.defaults), self.window)
+            finally:
+                history.close()
+        except Exception as e:
+            logging.error(f"Error loading latency history for timeouts: {str(e)}")
+            return
+
+        groups = {}
+        pools = {}
+        for check_name, metric, value in rows:
+            groups.setdefault((check_name, metric), []).append(value * 1000)
+            pools.setdefault((series_profile(check_name), metric), []).append(value * 1000)
+
+        self.observed = {key: (len(values), percentile(values, 99)) for key, values in groups.items()}
+        self.pooled = {key: (len(values), percentile(values, 99)) for key, values in pools.items()}
+
+    def get(self, phase, check=None):
+        """
+        Returns: timeout in ms for the phase of the check. A p99 observed under
+        the profile of the current task is used as is, only the configured
+        default is scaled for the task.
+        """
+        timeout = self.observed_timeout(phase, check) if self.adaptive else None
+        if timeout is not None:
+            return timeout
+
+        timeout = self.defaults[phase]
+        scale = self.scale.get()
+        if scale == 1:
+            return timeout
+        timeout = int(timeout * scale)
+        if phase in self.limits:
+            timeout = min(timeout, self.limits[phase][1])
+        return timeout
+
+    def scaled(self, timeout):
+        """Returns: a fixed timeout in ms scaled for the current task"""
+        return int(timeout * self.scale.get())
+
+    def observed_timeout(self, phase, check=None):
+        """
+        p99 x factor within the phase limits, from the samples of the check or
+        else of all checks, under the node and profile of the current task
+        Returns: None until min_samples are collected
+        """
+        labels = self.get_labels()
+        observed = None
+        if check is not None:
+            observed = self.observed.get((series_name(check, labels), phase))
+        if not observed or observed[0] < self.min_samples:
+            observed = self.pooled.get((labels.get('profile'), phase))
+        if not observed or observed[0] < self.min_samples:
+            return None
+
+        default = self.defaults[phase]
+        floor, ceiling = self.limits.get(phase, (default, default))
+        return int(min(max(observed[1] * self.factor, floor), ceiling))